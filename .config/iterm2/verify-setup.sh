@@ -45,6 +45,28 @@ else
     echo "⚠ Custom config folder not enabled (will use defaults)"
 fi
 
+# Check WalterSignal profile against its spec
+if command -v python3 &> /dev/null && [ -f "$HOME/.config/iterm2/ws_plist.py" ]; then
+    PLIST_ARGS=()
+    if [ -n "$PREFS_PATH" ]; then
+        PLIST_ARGS=(--plist "${PREFS_PATH/#\~/$HOME}/com.googlecode.iterm2.plist")
+    fi
+    VERIFY_OUTPUT=$(python3 "$HOME/.config/iterm2/ws_plist.py" "${PLIST_ARGS[@]}" verify 2>&1)
+    case $? in
+        0)
+            echo "✓ WalterSignal profile matches waltersignal-profile.json"
+            ;;
+        1)
+            echo "⚠ WalterSignal profile differs from spec"
+            echo "  Details: python3 ~/.config/iterm2/ws_plist.py ${PLIST_ARGS[*]} verify"
+            ;;
+        *)
+            echo "✗ Could not check WalterSignal profile:"
+            echo "$VERIFY_OUTPUT" | tail -n 5 | sed 's/^/  /'
+            ;;
+    esac
+fi
+
 # Check for Claude Code compatibility
 if command -v claude &> /dev/null; then
     echo "✓ Claude Code CLI found"
@@ -0,0 +1,275 @@
+"""
+WalterSignal iTerm2 API adapter
+Thin layer over the iTerm2 Python API used by the WalterSignal tools.
+
+Every method is one round trip (or a batch run together) over the iTerm2
+websocket. ws_fake stands in for the iterm2 package underneath this
+class, so the tools (and the adapter itself) can be exercised on
+machines without iTerm2.
+"""
+
+import asyncio
+import json
+import re
+
+STREAM_SETTLE = 0.05  # seconds without updates before the screen is read
+
+
+async def async_set_profile_properties(api, guid, assignments):
+    """Write several properties through api.async_set_profile_property
+
+    The API takes one key per request, so the writes are sent together and
+    awaited as a group instead of one after another. Wrappers (LimitedAPI,
+    TracingAPI) only need to handle the single-property call.
+    """
+    await asyncio.gather(*(
+        api.async_set_profile_property(guid, key, value)
+        for key, value in assignments.items()
+    ))
+
+
+class ITerm2API:
+    """Profile and session operations on a live iterm2.Connection"""
+
+    def __init__(self, connection, iterm2=None):
+        self.connection = connection
+        self._iterm2 = iterm2  # imported on first use unless given
+        self.app = None
+        self.sessions = {}  # session_id -> iterm2.Session already in hand
+
+    @property
+    def iterm2(self):
+        if self._iterm2 is None:
+            import iterm2
+
+            self._iterm2 = iterm2
+        return self._iterm2
+
+    async def async_list_profiles(self, properties=None):
+        """Return [{property: value}] for every profile (all properties if None)"""
+        iterm2 = self.iterm2
+        partials = await iterm2.PartialProfile.async_query(
+            self.connection, properties=properties
+        )
+        return [p.all_properties for p in partials]
+
+    async def async_get_profile(self, guid):
+        """Return all properties of one profile, or None if it is gone"""
+        iterm2 = self.iterm2
+        partials = await iterm2.PartialProfile.async_query(
+            self.connection, guids=[guid], properties=None
+        )
+        return partials[0].all_properties if partials else None
+
+    async def async_subscribe_to_profile_changes(self, guid, callback):
+        """Call callback(guid) whenever iTerm2 reports the profile changed"""
+        iterm2 = self.iterm2
+        async def on_change(_connection, _notification):
+            callback(guid)
+
+        return await iterm2.notifications.async_subscribe_to_profile_change_notification(
+            self.connection, on_change, guid
+        )
+
+    async def async_unsubscribe(self, token):
+        iterm2 = self.iterm2
+        await iterm2.notifications.async_unsubscribe(self.connection, token)
+
+    async def async_create_profile(self, name):
+        """Create an empty profile and return its Guid"""
+        iterm2 = self.iterm2
+        profile = await iterm2.Profile.async_create(self.connection, name)
+        return profile.guid
+
+    async def async_set_profile_property(self, guid, key, value):
+        """Write one profile property (JSON value) to the profile with guid"""
+        iterm2 = self.iterm2
+        response = await iterm2.rpc.async_set_profile_property_json(
+            self.connection, None, key, json.dumps(value), [guid]
+        )
+        status = response.set_profile_property_response.status
+        ok = iterm2.api_pb2.SetProfilePropertyResponse.Status.Value("OK")
+        if status != ok:
+            raise iterm2.RPCException(
+                iterm2.api_pb2.SetProfilePropertyResponse.Status.Name(status)
+            )
+
+    # --- Sessions -------------------------------------------------------
+
+    async def _async_session(self, session_id):
+        """The iterm2.Session for session_id; KeyError if there is none
+
+        Sessions this adapter created are used as returned; others are
+        looked up in the app once.
+        """
+        iterm2 = self.iterm2
+        if session_id in self.sessions:
+            return self.sessions[session_id]
+        if self.app is None:
+            self.app = await iterm2.async_get_app(self.connection)
+        session = self.app.get_session_by_id(session_id)
+        if session is None:
+            # Created since the app snapshot was taken
+            await self.app.async_refresh()
+            session = self.app.get_session_by_id(session_id)
+        if session is None:
+            raise KeyError(f"No session {session_id}")
+        self.sessions[session_id] = session
+        return session
+
+    async def async_create_window(self, profile=None):
+        """Open a window and return the session_id of its only pane"""
+        iterm2 = self.iterm2
+        window = await iterm2.Window.async_create(self.connection, profile=profile)
+        session = window.current_tab.current_session
+        self.sessions[session.session_id] = session
+        return session.session_id
+
+    async def async_split_pane(self, session_id, vertical, before=False,
+                               profile=None):
+        """Split session_id and return the new pane's session_id"""
+        session = await self._async_session(session_id)
+        new = await session.async_split_pane(
+            vertical=vertical, before=before, profile=profile
+        )
+        self.sessions[new.session_id] = new
+        return new.session_id
+
+    async def async_equalize_panes(self, session_ids, vertical):
+        """Resize side-by-side panes (one split's siblings) to equal shares
+
+        iTerm2 halves the pane it splits, so three panes split off one
+        come out 1/2, 1/4, 1/4. Two round trips: an app snapshot for the
+        sizes after the splits, then the new layout.
+        """
+        iterm2 = self.iterm2
+        if self.app is None:
+            self.app = await iterm2.async_get_app(self.connection)
+        else:
+            await self.app.async_refresh()
+        sessions = [self.app.get_session_by_id(s) for s in session_ids]
+        if None in sessions:
+            raise KeyError(f"No session {session_ids[sessions.index(None)]}")
+        tab, _window = self.app.get_tab_and_window_for_session(sessions[0])
+        axis = "width" if vertical else "height"
+        total = sum(getattr(s.grid_size, axis) for s in sessions)
+        share, extra = divmod(total, len(sessions))
+        for i, session in enumerate(sessions):
+            size = {"width": session.grid_size.width,
+                    "height": session.grid_size.height}
+            size[axis] = share + (i < extra)
+            session.preferred_size = iterm2.util.Size(**size)
+        await tab.async_update_layout()
+
+    async def async_send_text(self, session_id, text):
+        session = await self._async_session(session_id)
+        await session.async_send_text(text)
+
+    async def async_wait_for_text(self, session_id, regex):
+        """Return the first screen line matching regex, waiting for output"""
+        session = await self._async_session(session_id)
+        pattern = re.compile(regex)
+        async with session.get_screen_streamer() as streamer:
+            contents = await session.async_get_screen_contents()
+            while True:
+                for i in range(contents.number_of_lines):
+                    line = contents.line(i).string
+                    if pattern.search(line):
+                        return line
+                contents = await streamer.async_get()
+
+    async def _async_cursor_line(self, session):
+        """(line info, absolute line number of the cursor row)
+
+        Reads the whole visible screen, so it is only used when output
+        pauses.
+        """
+        contents = await session.async_get_screen_contents()
+        info = await session.async_get_line_info()
+        return info, info.first_visible_line_number + contents.cursor_coord.y
+
+    async def async_stream_lines(self, session_id, settle=STREAM_SETTLE):
+        """Yield ([line numbers], [lines], lost) as output appears
+
+        Only lines that can no longer change are yielded, each fetched once
+        by absolute line number. Rows soft-wrapped from one line are joined
+        back into it; its line number is that of its first row. Updates are streamed without contents.
+        While output scrolls, only rows that have moved into history are
+        read. The screen is read, to find the cursor row, only once
+        updates pause for settle seconds. lost counts rows that scrolled
+        out of history before they could be read.
+        """
+        session = await self._async_session(session_id)
+        async with session.get_screen_streamer(want_contents=False) as streamer:
+            _info, last = await self._async_cursor_line(session)
+            pending = ""
+            pending_row = None
+            # One get() at a time and never cancelled, so no update is missed
+            update = asyncio.ensure_future(streamer.async_get())
+            settled = True
+            try:
+                while True:
+                    done, _ = await asyncio.wait(
+                        [update], timeout=None if settled else settle
+                    )
+                    if done:
+                        update.result()
+                        update = asyncio.ensure_future(streamer.async_get())
+                        info = await session.async_get_line_info()
+                        end = info.first_visible_line_number
+                        settled = False
+                    else:
+                        info, end = await self._async_cursor_line(session)
+                        settled = True
+                    lost = 0
+                    if last < info.overflow:
+                        lost = info.overflow - last
+                        last = info.overflow
+                        pending = ""
+                        pending_row = None
+                    if end <= last:
+                        continue
+                    numbers = []
+                    lines = []
+                    rows = await session.async_get_contents(last, end - last)
+                    for row, line in enumerate(rows, last):
+                        if pending_row is None:
+                            pending_row = row
+                        # Join soft-wrapped rows back into one logical line
+                        pending += line.string
+                        if line.hard_eol:
+                            numbers.append(pending_row)
+                            lines.append(pending)
+                            pending = ""
+                            pending_row = None
+                    last = end
+                    if lines or lost:
+                        yield numbers, lines, lost
+            finally:
+                update.cancel()
+
+    # --- Status bar -----------------------------------------------------
+
+    async def async_register_status_bar_component(self, identifier, name,
+                                                  exemplar, cadence, callback):
+        """Show the text returned by await callback(path) in a status-bar component
+
+        path is the session's working directory (None if unknown). iTerm2
+        calls back every cadence seconds for as long as the connection
+        stays open.
+        """
+        iterm2 = self.iterm2
+        component = iterm2.StatusBarComponent(
+            short_description=name,
+            detailed_description=name,
+            knobs=[],
+            exemplar=exemplar,
+            update_cadence=cadence,
+            identifier=identifier,
+        )
+
+        @iterm2.StatusBarRPC
+        async def coro(knobs, path=iterm2.Reference("path?")):
+            return await callback(path)
+
+        await component.async_register(self.connection, coro)
@@ -0,0 +1,73 @@
+"""
+WalterSignal profile apply engine
+Diffs a desired profile spec against the profile's current values and
+writes only what changed.
+
+Specs use the same keys and JSON values as waltersignal-profile.json
+(e.g. "Badge Text", "Background Color" with "Red Component" floats).
+"""
+
+import time
+
+import ws_api
+
+# Colors read back from iTerm2 carry float noise and a "Color Space" key;
+# anything closer than half of an 8-bit step is the same color.
+FLOAT_TOLERANCE = 0.5 / 255
+
+# Keys that describe the spec itself rather than profile settings
+SPEC_ONLY_KEYS = ("Name", "Guid")
+
+
+def same_value(current, desired):
+    """True if current already satisfies desired"""
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return False
+        return all(
+            k in current and same_value(current[k], v)
+            for k, v in desired.items()
+        )
+    if isinstance(desired, list):
+        if not isinstance(current, list) or len(current) != len(desired):
+            return False
+        return all(same_value(c, d) for c, d in zip(current, desired))
+    if isinstance(desired, bool) or isinstance(current, bool):
+        return current is desired
+    if isinstance(desired, (int, float)) and isinstance(current, (int, float)):
+        return abs(current - desired) <= FLOAT_TOLERANCE
+    return current == desired
+
+
+def diff(current, desired):
+    """Return {key: desired value} for every key that needs writing"""
+    return {
+        key: value
+        for key, value in desired.items()
+        if key not in SPEC_ONLY_KEYS
+        and not same_value(current.get(key), value)
+    }
+
+
+async def async_read_profile(api, guid):
+    """Fetch all current values of one profile in a single round trip"""
+    profile = await api.async_get_profile(guid)
+    if profile is None:
+        raise KeyError(guid)
+    return profile
+
+
+async def async_apply(api, guid, desired, current=None):
+    """Bring profile guid in line with desired
+
+    current may be passed in when the caller already holds the profile's
+    properties; otherwise they are read once. Returns {"changes": {...},
+    "seconds": float}. An up-to-date profile costs zero writes.
+    """
+    start = time.perf_counter()
+    if current is None:
+        current = await async_read_profile(api, guid)
+    changes = diff(current, desired)
+    if changes:
+        await ws_api.async_set_profile_properties(api, guid, changes)
+    return {"changes": changes, "seconds": time.perf_counter() - start}
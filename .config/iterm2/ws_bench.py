@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+WalterSignal iTerm2 benchmarks
+Times the profile tools, through ws_api.ITerm2API, against ws_fake's
+in-memory iTerm2 with injected latency.
+
+Usage: ws_bench.py apply [--latency MS]
+       ws_bench.py resolve [--profiles N] [--latency MS]
+       ws_bench.py sync [--profiles N] [--latency MS] [--max-in-flight N]
+       ws_bench.py daemon [--runs N] [--connect-ms MS] [--latency MS]
+       ws_bench.py layout [--latency MS] [--startup-ms MS]
+       ws_bench.py monitor [--lines N] [--rate N] [--queue N] [--consumer-ms MS]
+       ws_bench.py status [--runs N] [--db FILE] [--claude-json FILE]
+       ws_bench.py suite [--scenario FILE] [--baseline FILE] [--update-baseline]
+                         [--trace OUT.json] [--tolerance FRACTION]
+
+`suite` runs every tool against a scripted fake (ws_bench_scenario.json),
+traces each API call and fails if round trips or wall time regress
+against ws_bench_baseline.json.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import ws_apply
+import ws_fake
+import ws_layout
+import ws_monitor
+import ws_profiles
+import ws_status
+import ws_sync
+import ws_trace
+import ws_triggers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLIST = os.path.join(HERE, "com.googlecode.iterm2.plist")
+HOME = os.path.dirname(os.path.dirname(HERE))  # this file lives in ~/.config/iterm2
+SERIAL_SETTINGS = 8  # async_set_* calls the old quick-setup made per run
+
+
+def load_spec(name="waltersignal-profile.json"):
+    with open(os.path.join(HERE, name)) as f:
+        return json.load(f)
+
+
+async def bench_apply(latency):
+    spec = load_spec()
+    fake = ws_fake.FakeITerm2(latency=latency)
+    api = fake.api()
+    guid = fake.add_profile({"Name": spec["Name"]})
+
+    for label in ("first run", "re-run"):
+        fake.reset_stats()
+        start = time.perf_counter()
+        result = await ws_apply.async_apply(api, guid, spec)
+        elapsed = time.perf_counter() - start
+        print(f"{label:10} {elapsed * 1000:7.1f}ms  "
+              f"round trips={fake.round_trips}  "
+              f"writes={len(result['changes'])}  "
+              f"max in flight={fake.max_in_flight}")
+
+    print(f"{'serial':10} {(SERIAL_SETTINGS + 1) * latency * 1000:7.1f}ms  "
+          f"round trips={SERIAL_SETTINGS + 1}  (previous quick-setup)")
+
+
+def synthetic_profiles(count):
+    """count copies of the first profile in com.googlecode.iterm2.plist"""
+    template = ws_fake.profiles_from_plist(PLIST)[0]
+    return ws_fake.synthetic_profiles(template, count)
+
+
+async def bench_resolve(count, latency, bytes_per_second):
+    fake = ws_fake.FakeITerm2(synthetic_profiles(count), latency=latency,
+                              bytes_per_second=bytes_per_second)
+    api = fake.api()
+    target = f"Synthetic {count - 1:04d}"
+
+    async def linear_scan():
+        for p in await api.async_list_profiles():
+            if p.get("Name") == target:
+                return p
+
+    resolver = ws_profiles.ProfileResolver(api)
+    cases = [
+        ("linear scan", linear_scan),
+        ("index cold", lambda: resolver.async_get_profile(target)),
+        ("index warm", lambda: resolver.async_get_profile(target)),
+    ]
+    for label, lookup in cases:
+        fake.reset_stats()
+        start = time.perf_counter()
+        profile = await lookup()
+        elapsed = time.perf_counter() - start
+        assert profile["Name"] == target
+        print(f"{label:12} {elapsed * 1000:8.1f}ms  "
+              f"round trips={fake.round_trips}  "
+              f"received={fake.bytes_received() / 1024:8.1f}KB")
+
+
+async def bench_sync(count, latency, max_in_flight):
+    base = ws_sync.load_spec(os.path.join(HERE, "waltersignal-profile.json"))
+    base.pop("Guid", None)  # each copy gets its own Guid from the fake
+    specs = [dict(base, Name=f"Fleet {i:03d}") for i in range(count)]
+
+    for limit in (1, max_in_flight):
+        fake = ws_fake.FakeITerm2(latency=latency)
+        # A third missing, a third stale, a third already synced
+        for i, spec in enumerate(specs):
+            if i % 3 == 1:
+                fake.add_profile({"Name": spec["Name"], "Badge Text": "old"})
+            elif i % 3 == 2:
+                fake.add_profile(spec)
+        api = ws_sync.LimitedAPI(fake.api(), limit)
+        start = time.perf_counter()
+        plan = await ws_sync.async_plan(api, specs)
+        planned = time.perf_counter() - start
+        actions = [e["action"] for e in plan]
+        await ws_sync.async_apply_plan(api, plan)
+        elapsed = time.perf_counter() - start
+        print(f"max in flight={limit:3}  plan {planned * 1000:7.1f}ms  "
+              f"total {elapsed * 1000:8.1f}ms  round trips={fake.round_trips}  "
+              f"peak={fake.max_in_flight}  "
+              f"({actions.count('create')} create, {actions.count('update')} "
+              f"update, {actions.count('no-op')} no-op)")
+
+
+def _median_run(argv, runs, env=None):
+    """Median wall time in seconds of running argv as a subprocess"""
+    import statistics
+    import subprocess
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_daemon(runs, connect_ms, latency_ms):
+    import shutil
+    import subprocess
+    import sys
+    import tempfile
+
+    python = sys.executable
+    tmp = tempfile.mkdtemp(prefix="ws_bench_")
+    env = dict(os.environ, WS_DAEMON_SOCKET=os.path.join(tmp, "daemon.sock"),
+               WS_FAKE_CONNECT_MS=str(connect_ms),
+               WS_FAKE_LATENCY_MS=str(latency_ms))
+
+    print("Import time (interpreter start + imports, median)")
+    imports = [("python only", "pass"), ("ws_client", "import ws_client"),
+               ("ws_daemon + ws_api", "import ws_daemon, ws_api")]
+    try:
+        import iterm2  # noqa: F401
+        imports.append(("iterm2", "import iterm2"))
+    except ImportError:
+        print("  (iterm2 not installed; its own import cost is not included)")
+    for label, code in imports:
+        seconds = _median_run([python, "-c", code], runs, dict(env, PYTHONPATH=HERE))
+        print(f"  {label:20} {seconds * 1000:7.1f}ms")
+
+    print("")
+    print(f"End-to-end `profile WalterSignal` (fake connect {connect_ms:.0f}ms, "
+          f"round trip {latency_ms:.0f}ms, median)")
+    once = [python, os.path.join(HERE, "ws_daemon.py"), "once",
+            "profile", "WalterSignal", "--fake"]
+    seconds = _median_run(once, runs, env)
+    print(f"  {'fresh connection':20} {seconds * 1000:7.1f}ms")
+
+    daemon = subprocess.Popen(
+        [python, os.path.join(HERE, "ws_daemon.py"), "serve", "--fake"],
+        env=env, stderr=subprocess.PIPE,
+    )
+    try:
+        daemon.stderr.readline()  # "listening on ..."
+        client = [python, os.path.join(HERE, "ws_client.py"),
+                  "profile", "WalterSignal"]
+        seconds = _median_run(client, runs, env)
+        print(f"  {'via ws_daemon':20} {seconds * 1000:7.1f}ms")
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+async def bench_layout(latency, startup):
+    import sys
+
+    outputs = {"npm run dev": [(startup, "  ✓ Ready in 1.2s")]}
+
+    # The chained style from CLAUDE_CODE_WORKFLOWS.md / launch_claude.py
+    fake = ws_fake.FakeITerm2(latency=latency, outputs=outputs)
+    api = fake.api()
+    start = time.perf_counter()
+    claude = await api.async_create_window()
+    await api.async_send_text(claude, "claude\n")
+    tests = await api.async_split_pane(claude, vertical=True)
+    await api.async_send_text(tests, "npm run test:watch\n")
+    dev = await api.async_split_pane(tests, vertical=False)
+    await api.async_send_text(dev, "npm run dev\n")
+    await api.async_wait_for_text(dev, ws_layout.ready_regex())
+    print(f"{'chained':10} ready {(time.perf_counter() - start) * 1000:7.1f}ms  "
+          f"round trips={fake.round_trips}")
+
+    fake = ws_fake.FakeITerm2(latency=latency, outputs=outputs)
+    start = time.perf_counter()
+    panes = await ws_layout.async_build(fake.api())
+    print(f"{'ws_layout':10} ready {(time.perf_counter() - start) * 1000:7.1f}ms  "
+          f"round trips={fake.round_trips}  peak in flight={fake.max_in_flight}")
+    for pane in panes:
+        print(f"    {pane['name']:12} created {pane['created'] * 1000:6.1f}ms  "
+              f"ready {pane['ready'] * 1000:6.1f}ms")
+
+    # Three siblings come out 1/2, 1/4, 1/4 unless they are resized
+    fake = ws_fake.FakeITerm2(latency=latency)
+    columns = {"split": "vertical",
+               "panes": [{"name": name} for name in ("Left", "Middle", "Right")]}
+    start = time.perf_counter()
+    panes = await ws_layout.async_build(fake.api(), columns)
+    widths = [fake.sessions[p["session_id"]].grid_size.width for p in panes]
+    print(f"{'3 columns':10} built {(time.perf_counter() - start) * 1000:7.1f}ms  "
+          f"round trips={fake.round_trips}  widths={widths}")
+    if max(widths) - min(widths) > 1:
+        print("✗ sibling panes are not evenly sized")
+        sys.exit(1)
+
+
+def build_log(count):
+    """count lines of build output, ~1% errors and ~1% warnings
+
+    Errors are longer than a terminal row, so they arrive soft-wrapped.
+    """
+    lines = []
+    for i in range(count):
+        if i % 100 == 7:
+            lines.append(f"src/module_{i}.ts(12,5): error TS2322: Type "
+                         "'{ id: number; name: string; tags: string[] }' is not "
+                         f"assignable to type 'Module{i}Props'.")
+        elif i % 100 == 42:
+            lines.append(f"Warning: unused variable 'x{i}' in src/module_{i}.ts")
+        else:
+            lines.append(f"  compiling src/module_{i}.ts ... {i * 37 % 997}ms")
+    return lines
+
+
+async def bench_monitor(count, rate, queue_size, consumer_delay, history,
+                        max_catch_up):
+    import sys
+
+    triggers = ws_triggers.load_triggers()
+    lines = build_log(count)
+
+    fake = ws_fake.FakeITerm2(history=history)
+    session = fake.new_session()
+    monitor = ws_monitor.Monitor(fake.api(), triggers, maxsize=queue_size)
+    # Row each line starts on in the fresh session; long lines take several
+    starts = []
+    row = 0
+    for line in lines:
+        starts.append(row)
+        row += max(1, -(-len(line) // fake.columns))
+    hits = {(starts[index], trigger["regex"])
+            for index, trigger in ws_monitor.TriggerSet(triggers).scan(lines)}
+    expected = len(hits)
+    delivered = set()
+    received = 0
+    max_depth = 0
+
+    async def consume():
+        nonlocal received, max_depth
+        while True:
+            max_depth = max(max_depth, monitor.queue.qsize())
+            event = await monitor.queue.get()
+            delivered.add((event["line_number"], event["regex"]))
+            received += 1
+            if consumer_delay:
+                await asyncio.sleep(consumer_delay)
+
+    def caught_up():
+        stats = monitor.stats
+        return (stats["lines"] + stats["lost"] >= count
+                and received == stats["events"])
+
+    reader = asyncio.ensure_future(monitor.async_run([session]))
+    consumer = asyncio.ensure_future(consume())
+    # Let the reader subscribe and find the cursor before output starts
+    while not any(call[0] == "get_line_info" for call in fake.calls):
+        await asyncio.sleep(0)
+    start = time.perf_counter()
+    cpu = time.process_time()
+    await fake.async_spew(session, lines, rate)
+    produced = time.perf_counter() - start
+    deadline = time.perf_counter() + max_catch_up
+    while not caught_up() and not reader.done() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.001)
+    done = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    reader.cancel()
+    consumer.cancel()
+
+    print(f"output   {count} lines in {produced:.2f}s "
+          f"({count / produced:,.0f} lines/s)")
+    print(f"monitor  {monitor.stats['lines']} lines read in "
+          f"{monitor.stats['batches']} batches, lost={monitor.stats['lost']}")
+    reads = {}
+    for method, _args, _time, size in fake.calls:
+        count_, total = reads.get(method, (0, 0))
+        reads[method] = (count_ + 1, total + size)
+    screens, screen_bytes = reads.get("get_screen_contents", (0, 0))
+    rows, row_bytes = reads.get("get_contents", (0, 0))
+    print(f"reads    {rows} row reads ({row_bytes / 1024:,.0f}KB), "
+          f"{screens} full-screen reads ({screen_bytes / 1024:,.1f}KB)")
+    print(f"events   {received}/{expected} delivered, "
+          f"caught up {(done - produced) * 1000:.0f}ms after output stopped, "
+          f"max queue depth={max_depth}/{queue_size}")
+    print(f"cpu      {cpu:.2f}s ({cpu / done * 100:.0f}% of wall time, "
+          f"includes the fake producer)")
+
+    failures = []
+    if reader.done() and not reader.cancelled() and reader.exception():
+        failures.append(f"reader failed: {reader.exception()!r}")
+    if received != expected:
+        failures.append(f"{expected - received} events not delivered")
+    if delivered - hits:
+        failures.append(f"{len(delivered - hits)} events with the wrong line number")
+    if history is None and monitor.stats["lost"]:
+        failures.append(f"{monitor.stats['lost']} lines lost with unbounded history")
+    if not caught_up():
+        failures.append(f"not caught up {max_catch_up * 1000:.0f}ms "
+                        "after output stopped")
+    if failures:
+        print(f"✗ {'; '.join(failures)}")
+        sys.exit(1)
+
+
+# --- Regression suite ----------------------------------------------------
+
+SPEC_PATH = os.path.join(HERE, "waltersignal-profile.json")
+SCENARIO_PATH = os.path.join(HERE, "ws_bench_scenario.json")
+BASELINE_PATH = os.path.join(HERE, "ws_bench_baseline.json")
+WALL_SLACK_MS = 5.0  # absolute slack on top of --tolerance for tiny cases
+# Real wall time that depends on the machine, not on fake latency: shown
+# next to the baseline but never fails the suite
+REPORT_ONLY = ("import tools",)
+
+
+# Each case is (name, prepare, run, scenario overrides). prepare(fake) sets
+# up state untraced; run(api, state) is what gets timed, with api an
+# ITerm2API over the fake. Round trips are counted by the fake.
+
+def _median_call(function, runs):
+    """Median seconds per call of function()"""
+    import statistics
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_status(runs, db, claude_json):
+    import sys
+
+    print(f"n8n:         {db} ({os.path.getsize(db) / 1024:.0f}KB)")
+    print(f"claude.json: {claude_json} ({os.path.getsize(claude_json) / 1024:.1f}KB)")
+
+    def cold():
+        status = ws_status.Status(db, claude_json)
+        status.line()
+        status.close()
+
+    status = ws_status.Status(db, claude_json)
+    print(f"journal:     {status.n8n.journal_mode()}")
+
+    def pooled():
+        # Files "changed": re-query and re-parse on pooled connections
+        status.n8n.signature = None
+        status.claude.signature = None
+        status.line()
+
+    print("")
+    print(f"Status.line() (median of {runs})")
+    print(f"  {'cold':20} {_median_call(cold, runs) * 1000:8.3f}ms  "
+          "connect + prepare + parse every call")
+    print(f"  {'pooled':20} {_median_call(pooled, runs) * 1000:8.3f}ms  "
+          "reused connection and statements, files re-read")
+    print(f"  {'warm':20} {_median_call(status.line, runs) * 1000:8.3f}ms  "
+          "cached until mtime/size changes")
+    print(f"  (connections opened: {status.n8n.pool.opened}, "
+          f"queries: {status.n8n.stats['queries']}, "
+          f"cache hits: {status.n8n.stats['hits']})")
+
+    env = dict(os.environ, WS_N8N_DB=db, WS_CLAUDE_JSON=claude_json)
+    cli = [sys.executable, os.path.join(HERE, "ws_status.py"), "line"]
+    seconds = _median_run(cli, min(runs, 20), env)
+    print(f"  {'new process':20} {seconds * 1000:8.3f}ms  ws_status.py line")
+    status.close()
+
+
+async def prepare_connection(fake):
+    return fake
+
+
+async def run_connect(api, fake):
+    await fake.async_connect()
+
+
+async def prepare_spec(fake):
+    return ws_sync.load_spec(SPEC_PATH)
+
+
+async def prepare_synced(fake):
+    spec = ws_sync.load_spec(SPEC_PATH)
+    await ws_sync.async_sync(fake.api(), [spec])
+    return spec
+
+
+async def run_quick_setup(api, spec):
+    await ws_sync.async_sync(api, [spec])
+
+
+async def prepare_resolver(fake):
+    resolver = ws_profiles.ProfileResolver(fake.api(), watch=False)
+    await resolver.async_refresh()
+    return resolver
+
+
+async def run_resolve_cold(api, state):
+    await ws_profiles.ProfileResolver(api).async_get_profile("Synthetic 0999")
+
+
+async def run_resolve_warm(api, resolver):
+    resolver.api = api
+    await resolver.async_get_profile("Synthetic 0999")
+
+
+async def prepare_fleet(fake):
+    base = ws_sync.load_spec(SPEC_PATH)
+    base.pop("Guid", None)  # each copy gets its own Guid from the fake
+    specs = [dict(base, Name=f"Fleet {i:03d}") for i in range(30)]
+    # A third missing, a third stale, a third already synced
+    for i, spec in enumerate(specs):
+        if i % 3 == 1:
+            fake.add_profile({"Name": spec["Name"], "Badge Text": "old"})
+        elif i % 3 == 2:
+            fake.add_profile(spec)
+    return specs
+
+
+async def run_sync_fleet(api, specs):
+    await ws_sync.async_sync(api, specs)
+
+
+async def run_layout(api, state):
+    await ws_layout.async_build(api)
+
+
+async def nothing(fake):
+    return None
+
+
+SYNTHETIC_1000 = {"profiles": {"synthetic": 1000}}
+SUITE = [
+    ("connect", prepare_connection, run_connect, {}),
+    ("quick-setup", prepare_spec, run_quick_setup, {}),
+    ("quick-setup re-run", prepare_synced, run_quick_setup, {}),
+    ("resolve cold 1000", nothing, run_resolve_cold, SYNTHETIC_1000),
+    ("resolve warm 1000", prepare_resolver, run_resolve_warm, SYNTHETIC_1000),
+    ("sync fleet 30", prepare_fleet, run_sync_fleet, {}),
+    ("layout standard", nothing, run_layout, {}),
+]
+
+
+def import_time(runs=5):
+    """Median ms to import every tool, over bare interpreter start"""
+    import sys
+
+    env = dict(os.environ, PYTHONPATH=HERE)
+    modules = "ws_api, ws_daemon, ws_layout, ws_monitor, ws_sync, ws_trace"
+    bare = _median_run([sys.executable, "-c", "pass"], runs, env)
+    full = _median_run([sys.executable, "-c", f"import {modules}"], runs, env)
+    return (full - bare) * 1000
+
+
+async def run_suite(scenario):
+    import contextlib
+    import io
+
+    origin = time.perf_counter()
+    results = {}
+    events = []
+    for pid, (name, prepare, run, overrides) in enumerate(SUITE, 1):
+        fake = ws_fake.FakeITerm2.from_scenario(dict(scenario, **overrides), PLIST)
+        tracer = ws_trace.Tracer(pid=pid, origin=origin)
+        api = ws_trace.TracingAPI(fake.api(), tracer)
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = await prepare(fake)
+            fake.reset_stats()
+            with tracer.span(name) as span:
+                start = time.perf_counter()
+                await run(api, state)
+                wall = time.perf_counter() - start
+                span.update(tracer.summary())
+        results[name] = {
+            "round_trips": fake.round_trips,
+            "wall_ms": round(wall * 1000, 1),
+            "sent": tracer.summary()["sent"],
+            "received": fake.bytes_received(),
+        }
+        events.append({"name": "process_name", "ph": "M", "pid": pid,
+                       "args": {"name": name}})
+        events.extend(tracer.events)
+    return results, events
+
+
+def compare(results, baseline, tolerance):
+    """Print each result against baseline; return the names that regressed"""
+    regressed = []
+    print(f"{'case':22} {'round trips':>14} {'wall ms':>18} {'received':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        flags = []
+        gated = base and name not in REPORT_ONLY
+        if gated:
+            if result["round_trips"] > base["round_trips"]:
+                flags.append("round trips")
+            limit = base["wall_ms"] * (1 + tolerance) + WALL_SLACK_MS
+            if result["wall_ms"] > limit:
+                flags.append("wall time")
+        trips = str(result["round_trips"])
+        wall = f"{result['wall_ms']:.1f}"
+        if base:
+            trips += f" ({base['round_trips']})"
+            wall += f" ({base['wall_ms']:.1f})"
+        mark = "✗" if flags else ("✓" if gated else "·")
+        print(f"{mark} {name:20} {trips:>14} {wall:>18} "
+              f"{result['received'] / 1024:8.1f}KB  {', '.join(flags)}")
+        if flags:
+            regressed.append(name)
+    return regressed
+
+
+def bench_suite(scenario_path, baseline_path, update, trace_path, tolerance):
+    import sys
+
+    with open(scenario_path) as f:
+        scenario = json.load(f)
+    results, events = asyncio.run(run_suite(scenario))
+    results["import tools"] = {"round_trips": 0,
+                               "wall_ms": round(import_time(), 1),
+                               "sent": 0, "received": 0}
+
+    if trace_path:
+        with open(trace_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    if update:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        compare(results, {}, tolerance)
+        print(f"✓ Baseline written to {baseline_path}")
+        return
+
+    try:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+        print(f"⚠️  No baseline at {baseline_path} (use --update-baseline)")
+    regressed = compare(results, baseline, tolerance)
+    if trace_path:
+        print(f"✓ Trace written to {trace_path}")
+    if regressed:
+        print(f"✗ Regressed: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = sub.add_parser("apply", help="diff-based profile apply")
+    apply_parser.add_argument("--latency", type=float, default=5.0,
+                              help="fake round-trip latency in ms")
+
+    resolve_parser = sub.add_parser("resolve", help="profile lookup by name")
+    resolve_parser.add_argument("--profiles", type=int, default=1000)
+    resolve_parser.add_argument("--latency", type=float, default=5.0,
+                                help="fake round-trip latency in ms")
+    resolve_parser.add_argument("--mb-per-second", type=float, default=50.0,
+                                help="fake response throughput")
+
+    sync_parser = sub.add_parser("sync", help="multi-profile sync")
+    sync_parser.add_argument("--profiles", type=int, default=30)
+    sync_parser.add_argument("--latency", type=float, default=5.0,
+                             help="fake round-trip latency in ms")
+    sync_parser.add_argument("--max-in-flight", type=int,
+                             default=ws_sync.MAX_IN_FLIGHT)
+
+    daemon_parser = sub.add_parser("daemon", help="ws_daemon vs fresh connections")
+    daemon_parser.add_argument("--runs", type=int, default=7)
+    daemon_parser.add_argument("--connect-ms", type=float, default=100.0,
+                               help="fake cookie exchange + handshake time")
+    daemon_parser.add_argument("--latency", type=float, default=5.0,
+                               help="fake round-trip latency in ms")
+
+    layout_parser = sub.add_parser("layout", help="workspace layout builder")
+    layout_parser.add_argument("--latency", type=float, default=5.0,
+                               help="fake round-trip latency in ms")
+    layout_parser.add_argument("--startup-ms", type=float, default=50.0,
+                               help="dev server time to print its ready line")
+
+    monitor_parser = sub.add_parser("monitor", help="screen output monitor")
+    monitor_parser.add_argument("--lines", type=int, default=250000)
+    monitor_parser.add_argument("--rate", type=float, default=50000,
+                                help="lines per second printed")
+    monitor_parser.add_argument("--queue", type=int,
+                                default=ws_monitor.QUEUE_SIZE)
+    monitor_parser.add_argument("--consumer-ms", type=float, default=0.0,
+                                help="time the consumer spends per event")
+    monitor_parser.add_argument("--history", type=int, default=None,
+                                help="fake scrollback limit in lines")
+    monitor_parser.add_argument("--max-catch-up-ms", type=float, default=1000,
+                                help="fail if events lag output by longer")
+
+    status_parser = sub.add_parser("status", help="n8n / .claude.json status cache")
+    status_parser.add_argument("--runs", type=int, default=200)
+    status_parser.add_argument("--db", default=os.path.join(
+        HOME, ".n8n", "database.sqlite"))
+    status_parser.add_argument("--claude-json", default=os.path.join(
+        HOME, ".claude.json"))
+
+    suite_parser = sub.add_parser("suite", help="regression suite with tracing")
+    suite_parser.add_argument("--scenario", default=SCENARIO_PATH)
+    suite_parser.add_argument("--baseline", default=BASELINE_PATH)
+    suite_parser.add_argument("--update-baseline", action="store_true")
+    suite_parser.add_argument("--trace", help="write a Chrome trace here")
+    suite_parser.add_argument("--tolerance", type=float, default=0.5,
+                              help="allowed wall time growth (0.5 = +50%%)")
+
+    args = parser.parse_args()
+    if args.command == "apply":
+        asyncio.run(bench_apply(args.latency / 1000))
+    elif args.command == "resolve":
+        asyncio.run(bench_resolve(args.profiles, args.latency / 1000,
+                                  args.mb_per_second * 1024 * 1024))
+    elif args.command == "sync":
+        asyncio.run(bench_sync(args.profiles, args.latency / 1000,
+                               args.max_in_flight))
+    elif args.command == "daemon":
+        bench_daemon(args.runs, args.connect_ms, args.latency)
+    elif args.command == "layout":
+        asyncio.run(bench_layout(args.latency / 1000, args.startup_ms / 1000))
+    elif args.command == "monitor":
+        asyncio.run(bench_monitor(args.lines, args.rate, args.queue,
+                                  args.consumer_ms / 1000, args.history,
+                                  args.max_catch_up_ms / 1000))
+    elif args.command == "status":
+        bench_status(args.runs, args.db, args.claude_json)
+    elif args.command == "suite":
+        bench_suite(args.scenario, args.baseline, args.update_baseline,
+                    args.trace, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+WalterSignal daemon client
+Sends one command to ws_daemon.py over its Unix socket.
+
+Only the standard library pieces needed to talk to the socket are
+imported, so shell aliases don't pay for iterm2/protobuf/websockets or a
+new connection on every call.
+
+Usage: ws_client.py ping
+       ws_client.py profiles
+       ws_client.py profile NAME
+       ws_client.py sync [DIR] [--dry-run]
+       ws_client.py status [line|executions|claude]
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_PATH = os.environ.get(
+    "WS_DAEMON_SOCKET",
+    os.path.expanduser("~/.cache/waltersignal/ws_daemon.sock"),
+)
+COMMANDS = ("ping", "profiles", "profile", "sync", "status")
+STATUS_VIEWS = ("line", "executions", "claude")
+
+
+def build_request(argv):
+    """["sync", "dir", "--dry-run"] -> {"command": "sync", ...}
+
+    Raises ValueError on a bad command line.
+    """
+    if not argv or argv[0] not in COMMANDS:
+        raise ValueError(f"command must be one of: {', '.join(COMMANDS)}")
+    command, args = argv[0], argv[1:]
+    request = {"command": command}
+    if command == "profile":
+        if len(args) != 1:
+            raise ValueError("usage: profile NAME")
+        request["name"] = args[0]
+    elif command == "sync":
+        request["dry_run"] = "--dry-run" in args
+        paths = [a for a in args if a != "--dry-run"]
+        if len(paths) > 1:
+            raise ValueError("usage: sync [DIR] [--dry-run]")
+        if paths:
+            # The daemon's working directory is not ours
+            request["directory"] = os.path.abspath(paths[0])
+    elif command == "status":
+        if len(args) > 1 or (args and args[0] not in STATUS_VIEWS):
+            raise ValueError(f"usage: status [{'|'.join(STATUS_VIEWS)}]")
+        request["view"] = args[0] if args else "line"
+        request["cwd"] = os.getcwd()
+    elif args:
+        raise ValueError(f"usage: {command}")
+    return request
+
+
+def call(request, path=SOCKET_PATH, timeout=60):
+    """Send request, return the daemon's response dict
+
+    Raises ConnectionError if the daemon closes the socket without a
+    complete reply.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    reply = b"".join(chunks)
+    try:
+        return json.loads(reply)
+    except ValueError:
+        raise ConnectionError(
+            "ws_daemon closed the connection without a reply"
+            if not reply else "ws_daemon sent an incomplete reply"
+        ) from None
+
+
+def print_response(response):
+    """Print a response the way the direct tools would; return exit code"""
+    if response.get("output"):
+        print(response["output"], end="")
+    if not response.get("ok"):
+        print(f"✗ {response.get('error')}")
+        return 1
+    result = response.get("result")
+    if isinstance(result, str):
+        print(result)
+    elif result is not None:
+        print(json.dumps(result, indent=2, sort_keys=True, ensure_ascii=False))
+    return 0
+
+
+def main():
+    try:
+        request = build_request(sys.argv[1:])
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    try:
+        response = call(request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("✗ ws_daemon is not running (start: ~/.config/iterm2/ws_daemon.py serve &)")
+        sys.exit(2)
+    except (ConnectionError, socket.timeout) as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    sys.exit(print_response(response))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+WalterSignal iTerm2 daemon
+Holds one authenticated iTerm2 connection and serves the profile tools
+over a Unix socket (see ws_client.py). It also keeps a warm ws_status
+cache, shown in the "WalterSignal status" status-bar component.
+
+Requests and responses are one JSON object per line. sync runs one at a
+time so its printed output can be captured and sent back; ping, profiles,
+profile and status answer immediately, even while a sync is running.
+
+Usage: ws_daemon.py serve [--fake]
+       ws_daemon.py once COMMAND [ARGS...] [--fake]
+
+`once` runs a single command with a fresh connection, the way the tools
+worked before the daemon; ws_bench.py daemon compares the two.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+
+import ws_client
+import ws_profiles
+import ws_status
+import ws_sync
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATUS_COMPONENT = "com.waltersignal.status"
+STATUS_CADENCE = 5
+# Request fields and their types; the first group is required
+FIELDS = {
+    "profile": ({"name": str}, {}),
+    "sync": ({}, {"directory": str, "dry_run": bool}),
+    "status": ({}, {"view": str, "cwd": str}),
+}
+# Commands that change profiles run one at a time, with their printed
+# output captured. The others never print and answer straight away, even
+# while a sync is running.
+LOCKED = ("sync",)
+
+
+def error_text(e):
+    """Message for a failed command (KeyError's str() adds quotes)"""
+    if isinstance(e, KeyError) and e.args:
+        return str(e.args[0])
+    return str(e) or type(e).__name__
+
+
+def check_request(request):
+    """Raise ValueError unless request is a well-formed command object"""
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+    command = request.get("command")
+    if command not in ws_client.COMMANDS:
+        raise ValueError(f"unknown command {command!r}")
+    required, optional = FIELDS.get(command, ({}, {}))
+    for field, kind in {**optional, **required}.items():
+        if field not in request:
+            if field in required:
+                raise ValueError(f"{command} needs {field!r}")
+        elif not isinstance(request[field], kind):
+            raise ValueError(f"{field!r} must be a {kind.__name__}")
+
+
+class Daemon:
+    """Dispatches ws_client requests against one API object"""
+
+    def __init__(self, api):
+        self.api = api
+        self.resolver = ws_profiles.ProfileResolver(api)
+        self.status = ws_status.Status()
+        self.lock = asyncio.Lock()
+
+    async def _ping(self, request):
+        return {"pid": os.getpid()}
+
+    async def _profiles(self, request):
+        # One Name/Guid query; the index only hears about profiles it has
+        # handed out, so additions, renames and deletions need a refresh
+        await self.resolver.async_refresh()
+        return "\n".join(sorted(n for n in self.resolver.by_name if n))
+
+    async def _profile(self, request):
+        profile = await self.resolver.async_get_profile(request["name"])
+        if profile is None:
+            raise KeyError(f"No profile '{request['name']}'")
+        return profile
+
+    async def _sync(self, request):
+        specs = ws_sync.load_specs(request.get("directory", ws_sync.PROFILES_DIR))
+        if not specs:
+            raise ValueError("No profile specs found")
+        await ws_sync.async_sync(self.api, specs, request.get("dry_run", False))
+
+    async def _status(self, request):
+        view = request.get("view", "line")
+        cwd = request.get("cwd")
+        if view == "line":
+            return self.status.line(cwd)
+        text = io.StringIO()
+        if view == "executions":
+            ws_status.print_executions(self.status.executions(), text)
+        else:
+            ws_status.print_claude(self.status.claude_summary(cwd), text)
+        return text.getvalue().rstrip("\n")
+
+    async def async_register_status_bar(self):
+        """Serve Status.line() as an iTerm2 status-bar component"""
+
+        async def line(path):
+            return self.status.line(path)
+
+        await self.api.async_register_status_bar_component(
+            STATUS_COMPONENT, "WalterSignal status",
+            "n8n ✓12 ✗1 · mcp 5 · /research", STATUS_CADENCE, line,
+        )
+
+    async def async_handle(self, request):
+        try:
+            check_request(request)
+        except ValueError as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+        command = request["command"]
+        handler = getattr(self, "_" + command)
+        output = io.StringIO()
+        try:
+            if command in LOCKED:
+                async with self.lock:
+                    with contextlib.redirect_stdout(output):
+                        result = await handler(request)
+            else:
+                result = await handler(request)
+        except Exception as e:
+            # Anything from the API (RPCException, a dropped connection)
+            # still gets a reply, with the output printed so far
+            return {"ok": False, "output": output.getvalue(),
+                    "error": error_text(e)}
+        return {"ok": True, "output": output.getvalue(), "result": result}
+
+    async def _on_client(self, reader, writer):
+        try:
+            line = await reader.readline()
+            try:
+                response = await self.async_handle(json.loads(line))
+            except ValueError as e:
+                response = {"ok": False, "error": f"bad request: {e}"}
+            writer.write(json.dumps(response, default=str).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def async_serve(self, path=ws_client.SOCKET_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self._on_client, path)
+        os.chmod(path, 0o600)
+        print(f"✓ ws_daemon listening on {path}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def fake_iterm2(connect_latency=0.0, latency=0.0):
+    """FakeITerm2 seeded with the profiles from the plist"""
+    import ws_fake
+
+    profiles = ws_fake.profiles_from_plist(
+        os.path.join(HERE, "com.googlecode.iterm2.plist")
+    )
+    return ws_fake.FakeITerm2(profiles, latency=latency,
+                              connect_latency=connect_latency)
+
+
+def main():
+    argv = sys.argv[1:]
+    fake = "--fake" in argv
+    argv = [a for a in argv if a != "--fake"]
+    # Fake connection costs for benchmarks, in ms
+    connect_ms = float(os.environ.get("WS_FAKE_CONNECT_MS", "0"))
+    latency_ms = float(os.environ.get("WS_FAKE_LATENCY_MS", "0"))
+
+    if argv[:1] == ["serve"]:
+        if fake:
+            async def serve_fake():
+                connection = fake_iterm2(connect_ms / 1000, latency_ms / 1000)
+                await connection.async_connect()
+                daemon = Daemon(connection.api())
+                await daemon.async_register_status_bar()
+                await daemon.async_serve()
+
+            with contextlib.suppress(KeyboardInterrupt):
+                asyncio.run(serve_fake())
+            return
+
+        import ws_api
+        import ws_trace
+
+        async def serve(connection):
+            daemon = Daemon(ws_trace.wrap(ws_api.ITerm2API(connection)))
+            await daemon.async_register_status_bar()
+            await daemon.async_serve()
+
+        ws_trace.run_forever(serve)
+
+    elif argv[:1] == ["once"]:
+        try:
+            request = ws_client.build_request(argv[1:])
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(2)
+
+        if fake:
+            async def once_fake():
+                connection = fake_iterm2(connect_ms / 1000, latency_ms / 1000)
+                await connection.async_connect()
+                return await Daemon(connection.api()).async_handle(request)
+
+            sys.exit(ws_client.print_response(asyncio.run(once_fake())))
+
+        import ws_api
+        import ws_trace
+
+        responses = []
+
+        async def once(connection):
+            api = ws_trace.wrap(ws_api.ITerm2API(connection))
+            responses.append(await Daemon(api).async_handle(request))
+
+        ws_trace.run_until_complete(once)
+        sys.exit(ws_client.print_response(responses[0]))
+
+    else:
+        print(__doc__.strip())
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
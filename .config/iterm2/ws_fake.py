@@ -0,0 +1,506 @@
+"""
+WalterSignal iTerm2 fake
+In-memory iTerm2 with injectable latency, behind stand-ins for the parts
+of the iterm2 package that ws_api uses.
+
+FakeITerm2.api() is a real ws_api.ITerm2API whose connection is the fake
+and whose iterm2 module is ITERM2 below, so the adapter's own requests
+(app snapshots and refreshes, screen reads) run and are counted just as
+they would be against iTerm2.
+
+Sessions are lists of screen rows, capped at history rows; lines wider
+than the pane wrap onto further rows, as soft (not hard_eol) breaks, so
+readers have to join them back up. Panes start columns x screen_rows;
+splitting halves one, as iTerm2 does. outputs maps
+a command to the [(delay seconds, line)] printed after any sent line
+containing it, so readiness checks can be exercised; async_spew prints
+at a fixed rate for the screen monitor.
+
+Counts round trips, response sizes and how many were in flight at once,
+so the tools can be timed on Linux without iTerm2 running. With
+bytes_per_second set, large responses cost proportionally more, modelling
+the protobuf/JSON serialization of full profiles.
+"""
+
+import asyncio
+import collections
+import copy
+import json
+import time
+import types
+import uuid
+
+import ws_api
+
+
+class FakeITerm2:
+    """Profiles, sessions and round-trip accounting for one fake iTerm2
+
+    Also the connection object: the ITERM2 stand-ins route every request
+    to the fake they are given as connection.
+    """
+
+    def __init__(self, profiles=None, latency=0.0, bytes_per_second=None,
+                 connect_latency=0.0, outputs=None, history=None,
+                 method_latency=None, screen_rows=50, columns=80):
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.connect_latency = connect_latency
+        self.bytes_per_second = bytes_per_second
+        self.profiles = {}
+        for profile in profiles or []:
+            self.add_profile(profile)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.subscribers = {}
+        self.outputs = outputs or {}
+        self.history = history
+        self.screen_rows = screen_rows
+        self.columns = columns
+        self.sessions = {}
+        self.status_bar = {}
+
+    def api(self):
+        """A ws_api.ITerm2API connected to this fake"""
+        return ws_api.ITerm2API(self, ITERM2)
+
+    @property
+    def round_trips(self):
+        return len(self.calls)
+
+    def writes(self):
+        return [c for c in self.calls if c[0] == "set_profile_property"]
+
+    def bytes_received(self):
+        return sum(c[3] for c in self.calls)
+
+    def reset_stats(self):
+        self.calls = []
+        self.max_in_flight = 0
+
+    def add_profile(self, properties):
+        profile = copy.deepcopy(properties)
+        profile.setdefault("Guid", str(uuid.uuid4()).upper())
+        self.profiles[profile["Guid"]] = profile
+        return profile["Guid"]
+
+    def remove_profile(self, guid):
+        del self.profiles[guid]
+        self.notify(guid)
+
+    def notify(self, guid):
+        """Deliver a profile change notification, as iTerm2 does after edits"""
+        notification = types.SimpleNamespace(guid=guid)
+        for callback in list(self.subscribers.get(guid, [])):
+            asyncio.ensure_future(callback(self, notification))
+
+    async def _round_trip(self, method, *args, payload=None):
+        size = len(json.dumps(payload)) if payload is not None else 0
+        self.calls.append((method, args, time.perf_counter(), size))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        delay = self.method_latency.get(method, self.latency)
+        if self.bytes_per_second:
+            delay += size / self.bytes_per_second
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+
+    async def async_connect(self):
+        """Stand-in for iterm2's cookie exchange and websocket handshake"""
+        self.calls.append(("connect", (), time.perf_counter(), 0))
+        await asyncio.sleep(self.connect_latency)
+
+    def _select(self, profile, properties):
+        if properties is None:
+            return copy.deepcopy(profile)
+        return {k: copy.deepcopy(profile[k]) for k in properties if k in profile}
+
+    # --- Sessions -------------------------------------------------------
+
+    def new_session(self, tab=None, grid_size=None):
+        """Open a session without a request (e.g. one the user opened)"""
+        if tab is None:
+            tab = Window(self).current_tab
+        session = Session(self, f"fake-session-{len(self.sessions)}", tab,
+                          grid_size or Size(self.columns, self.screen_rows))
+        self.sessions[session.session_id] = session
+        tab.sessions.append(session)
+        tab.current_session = tab.current_session or session
+        return session.session_id
+
+    def print_lines(self, session_id, lines):
+        """Append output to a session's screen, dropping the oldest rows
+        beyond history like iTerm2's scrollback limit"""
+        self.sessions[session_id].print_lines(lines)
+
+    def print_line(self, session_id, line):
+        self.print_lines(session_id, [line])
+
+    async def async_spew(self, session_id, lines, lines_per_second, chunk=500):
+        """Print lines at a fixed rate, chunk lines per screen update"""
+        interval = chunk / lines_per_second
+        start = time.perf_counter()
+        for i in range(0, len(lines), chunk):
+            self.print_lines(session_id, lines[i:i + chunk])
+            # Sleep against the schedule, not per chunk, so the rate holds
+            delay = start + (i // chunk + 1) * interval - time.perf_counter()
+            await asyncio.sleep(max(delay, 0))
+
+    async def _async_run(self, session_id, text):
+        for command, output in self.outputs.items():
+            if command in text:
+                for delay, line in output:
+                    await asyncio.sleep(delay)
+                    self.print_line(session_id, line)
+
+    @classmethod
+    def from_scenario(cls, scenario, plist=None):
+        """Build a fake from a scenario dict (see ws_bench_scenario.json)
+
+        "profiles" is "plist" (the profiles in plist), a list of profile
+        dicts, or {"synthetic": N} for N copies of the plist's first one.
+        """
+        ms = 1 / 1000
+        profiles = scenario.get("profiles", [])
+        if profiles == "plist" or isinstance(profiles, dict):
+            source = profiles_from_plist(plist)
+            if isinstance(profiles, dict):
+                source = synthetic_profiles(source[0], profiles["synthetic"])
+            profiles = source
+        mb_per_second = scenario.get("mb_per_second")
+        return cls(
+            profiles,
+            latency=scenario.get("latency_ms", 0) * ms,
+            bytes_per_second=mb_per_second * 1024 * 1024 if mb_per_second else None,
+            connect_latency=scenario.get("connect_ms", 0) * ms,
+            outputs={k: [tuple(o) for o in v]
+                     for k, v in scenario.get("outputs", {}).items()},
+            history=scenario.get("history"),
+            method_latency={k: v * ms for k, v in
+                            scenario.get("method_latency_ms", {}).items()},
+        )
+
+
+
+# --- iterm2 stand-ins ----------------------------------------------------
+#
+# Each takes the FakeITerm2 where iterm2 takes a Connection. State is read
+# before the round trip is awaited, as iTerm2 answers from the moment it
+# handles the request.
+
+class RPCException(Exception):
+    pass
+
+
+class PartialProfile:
+    def __init__(self, properties):
+        self.all_properties = properties
+
+    @classmethod
+    async def async_query(cls, connection, guids=None, properties=None):
+        profiles = connection.profiles
+        if guids is not None:
+            profiles = {g: profiles[g] for g in guids if g in profiles}
+        result = [connection._select(p, properties) for p in profiles.values()]
+        await connection._round_trip("list_profiles", guids, properties,
+                                     payload=result)
+        return [cls(p) for p in result]
+
+
+class Profile:
+    def __init__(self, guid):
+        self.guid = guid
+
+    @classmethod
+    async def async_create(cls, connection, name):
+        await connection._round_trip("create_profile", name)
+        return cls(connection.add_profile({"Name": name}))
+
+
+SET_PROFILE_PROPERTY_STATUSES = ("OK", "SESSION_NOT_FOUND", "REQUEST_MALFORMED",
+                                 "BAD_GUID")
+
+
+class _Status:
+    """A protobuf enum: SetProfilePropertyResponse.Status"""
+
+    @staticmethod
+    def Value(name):
+        return SET_PROFILE_PROPERTY_STATUSES.index(name)
+
+    @staticmethod
+    def Name(number):
+        return SET_PROFILE_PROPERTY_STATUSES[number]
+
+
+async def _async_set_profile_property_json(connection, session_id, key,
+                                           json_value, guids=None):
+    status = "OK"
+    if any(guid not in connection.profiles for guid in guids or []):
+        status = "BAD_GUID"
+    await connection._round_trip("set_profile_property", guids, key)
+    if status == "OK":
+        for guid in guids or []:
+            connection.profiles[guid][key] = json.loads(json_value)
+            connection.notify(guid)
+    response = types.SimpleNamespace(status=_Status.Value(status))
+    return types.SimpleNamespace(set_profile_property_response=response)
+
+
+async def _async_subscribe_to_profile_change_notification(connection, callback,
+                                                         guid=None):
+    await connection._round_trip("subscribe_profile_change", guid)
+    connection.subscribers.setdefault(guid, []).append(callback)
+    return (guid, callback)
+
+
+async def _async_unsubscribe(connection, token):
+    guid, callback = token
+    await connection._round_trip("unsubscribe", guid)
+    connection.subscribers.get(guid, []).remove(callback)
+
+
+def _line_contents(row):
+    string, hard_eol = row
+    return types.SimpleNamespace(string=string, hard_eol=hard_eol)
+
+
+class ScreenContents:
+    def __init__(self, rows, cursor_y):
+        self.rows = rows
+        self.number_of_lines = len(rows)
+        self.cursor_coord = types.SimpleNamespace(x=0, y=cursor_y)
+
+    def line(self, index):
+        return _line_contents(self.rows[index])
+
+
+class ScreenStreamer:
+    """Wakes async_get() once per batch of screen updates"""
+
+    def __init__(self, session, want_contents):
+        self.session = session
+        self.want_contents = want_contents
+        self.changed = asyncio.Event()
+
+    async def __aenter__(self):
+        await self.session.fake._round_trip("subscribe_screen_update",
+                                            self.session.session_id)
+        self.session.streamers.add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session.streamers.discard(self)
+        await self.session.fake._round_trip("unsubscribe",
+                                            self.session.session_id)
+
+    async def async_get(self):
+        # Notifications are pushed, not requested: no round trip
+        await self.changed.wait()
+        self.changed.clear()
+        return self.session.screen() if self.want_contents else None
+
+
+class Session:
+    """A pane: (string, hard_eol) rows numbered from the start of history
+
+    The cursor sits on the row after the last printed line, at the
+    bottom of the screen once output fills it.
+    """
+
+    def __init__(self, fake, session_id, tab, grid_size):
+        self.fake = fake
+        self.session_id = session_id
+        self.tab = tab
+        self.grid_size = grid_size
+        self.preferred_size = None
+        self.rows = []
+        self.overflow = 0  # rows dropped off the top of history
+        self.streamers = set()
+
+    def print_lines(self, lines):
+        columns = self.grid_size.width
+        for line in lines:
+            wrapped = [line[i:i + columns]
+                       for i in range(0, len(line), columns)] or [""]
+            self.rows.extend((row, False) for row in wrapped[:-1])
+            self.rows.append((wrapped[-1], True))
+        history = self.fake.history
+        if history is not None and len(self.rows) > history:
+            excess = len(self.rows) - history
+            del self.rows[:excess]
+            self.overflow += excess
+        for streamer in self.streamers:
+            streamer.changed.set()
+
+    def cursor_line(self):
+        return self.overflow + len(self.rows)
+
+    def first_visible_line(self):
+        return max(self.overflow, self.cursor_line() + 1 - self.grid_size.height)
+
+    def screen(self):
+        first = self.first_visible_line()
+        return ScreenContents(self.rows[first - self.overflow:] + [("", False)],
+                              self.cursor_line() - first)
+
+    async def async_split_pane(self, vertical=False, before=False, profile=None):
+        await self.fake._round_trip("split_pane", self.session_id, vertical)
+        # The new pane gets half, less a row or column for the divider
+        axis = "width" if vertical else "height"
+        extent = getattr(self.grid_size, axis)
+        half = (extent - 1) // 2
+        self.grid_size = self.grid_size._replace(**{axis: extent - 1 - half})
+        grid_size = self.grid_size._replace(**{axis: half})
+        return self.fake.sessions[self.fake.new_session(self.tab, grid_size)]
+
+    async def async_send_text(self, text):
+        await self.fake._round_trip("send_text", self.session_id, text)
+        for command in text.splitlines():
+            self.print_lines([command])
+            asyncio.ensure_future(self.fake._async_run(self.session_id, command))
+
+    def get_screen_streamer(self, want_contents=True):
+        return ScreenStreamer(self, want_contents)
+
+    async def async_get_screen_contents(self):
+        screen = self.screen()
+        await self.fake._round_trip("get_screen_contents", self.session_id,
+                                    payload=screen.rows)
+        return screen
+
+    async def async_get_line_info(self):
+        first = self.first_visible_line()
+        info = types.SimpleNamespace(
+            overflow=self.overflow,
+            first_visible_line_number=first,
+            scrollback_buffer_height=first - self.overflow,
+            mutable_area_height=self.grid_size.height,
+        )
+        await self.fake._round_trip("get_line_info", self.session_id)
+        return info
+
+    async def async_get_contents(self, first_line, number_of_lines):
+        start = first_line - self.overflow
+        if start < 0:
+            number_of_lines += start
+            start = 0
+        rows = self.rows[start:start + max(number_of_lines, 0)]
+        await self.fake._round_trip("get_contents", self.session_id,
+                                    payload=rows)
+        return [_line_contents(row) for row in rows]
+
+
+class App:
+    """The sessions as of async_get_app or the last async_refresh"""
+
+    def __init__(self, fake):
+        self.fake = fake
+        self.sessions = dict(fake.sessions)
+
+    def get_session_by_id(self, session_id):
+        return self.sessions.get(session_id)
+
+    def get_tab_and_window_for_session(self, session):
+        return session.tab, session.tab.window
+
+    async def async_refresh(self):
+        self.sessions = dict(self.fake.sessions)
+        await self.fake._round_trip("list_sessions", payload=list(self.sessions))
+
+
+async def _async_get_app(connection):
+    app = App(connection)
+    await connection._round_trip("list_sessions", payload=list(app.sessions))
+    return app
+
+
+Size = collections.namedtuple("Size", "width height")
+
+
+class Tab:
+    def __init__(self, fake, window):
+        self.fake = fake
+        self.window = window
+        self.sessions = []
+        self.current_session = None
+
+    async def async_update_layout(self):
+        for session in self.sessions:
+            if session.preferred_size is not None:
+                session.grid_size = session.preferred_size
+        await self.fake._round_trip("update_layout")
+
+
+class Window:
+    def __init__(self, fake):
+        self.current_tab = Tab(fake, self)
+
+    @classmethod
+    async def async_create(cls, connection, profile=None):
+        await connection._round_trip("create_window", profile)
+        window = cls(connection)
+        connection.new_session(window.current_tab)
+        return window
+
+
+class StatusBarComponent:
+    def __init__(self, identifier, **kwargs):
+        self.identifier = identifier
+
+    async def async_register(self, connection, coro):
+        await connection._round_trip("register_status_bar_component",
+                                     self.identifier)
+        connection.status_bar[self.identifier] = coro
+
+
+class Reference:
+    def __init__(self, name):
+        self.name = name
+
+
+ITERM2 = types.SimpleNamespace(
+    App=App,
+    PartialProfile=PartialProfile,
+    Profile=Profile,
+    RPCException=RPCException,
+    Reference=Reference,
+    Session=Session,
+    StatusBarComponent=StatusBarComponent,
+    StatusBarRPC=lambda coro: coro,
+    Tab=Tab,
+    Window=Window,
+    api_pb2=types.SimpleNamespace(
+        SetProfilePropertyResponse=types.SimpleNamespace(Status=_Status)),
+    async_get_app=_async_get_app,
+    notifications=types.SimpleNamespace(
+        async_subscribe_to_profile_change_notification=(
+            _async_subscribe_to_profile_change_notification),
+        async_unsubscribe=_async_unsubscribe,
+    ),
+    rpc=types.SimpleNamespace(
+        async_set_profile_property_json=_async_set_profile_property_json),
+    util=types.SimpleNamespace(Size=Size),
+)
+
+def synthetic_profiles(template, count):
+    """count copies of template named "Synthetic NNNN" """
+    profiles = []
+    for i in range(count):
+        profile = copy.deepcopy(template)
+        profile["Name"] = f"Synthetic {i:04d}"
+        profile["Guid"] = f"SYNTHETIC-{i:04d}"
+        profiles.append(profile)
+    return profiles
+
+
+def profiles_from_plist(path=None):
+    """Profiles from an iTerm2 XML plist, with values as the API returns them"""
+    import ws_plist
+
+    index = ws_plist.PlistIndex(path or ws_plist.DEFAULT_PLIST)
+    # plist data/date values -> JSON types
+    return [json.loads(json.dumps(index[guid], default=str)) for guid in index]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+WalterSignal workspace layouts
+Builds split-pane workspaces from a declarative tree.
+
+A node is either a pane {"name", "command", "ready"} or a split
+{"split": "vertical"|"horizontal", "panes": [...]}. Sibling panes are
+split off together, so building the tree costs one dependent round trip
+per level instead of one per pane; three or more siblings are then
+resized to equal shares (two more round trips). "ready" is a regex; a
+pane counts as ready when it shows up on screen (panes without one are
+ready once their command is sent).
+
+Usage: ws_layout.py [PROJECT_DIR] [--layout FILE.json] [--profile NAME]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import sys
+import time
+
+import ws_triggers
+
+DEFAULT_READY = "✓ Ready in"
+READY_TIMEOUT = 120
+
+
+def ready_regex():
+    """The regex of the profile's build-complete Alert trigger"""
+    try:
+        triggers = ws_triggers.load_triggers()
+    except (OSError, ValueError):
+        return DEFAULT_READY
+    for trigger in triggers:
+        if trigger["action"] in ("Alert", "AlertTrigger"):
+            return trigger["regex"]
+    return DEFAULT_READY
+
+
+# Claude | Tests / Dev Server (CLAUDE_CODE_WORKFLOWS.md)
+STANDARD_WORKSPACE = {
+    "split": "vertical",
+    "panes": [
+        {"name": "Claude", "command": "claude"},
+        {"split": "horizontal", "panes": [
+            {"name": "Tests", "command": "npm run test:watch"},
+            {"name": "Dev Server", "command": "npm run dev", "ready": ready_regex()},
+        ]},
+    ],
+}
+
+
+async def _async_pane(api, node, session_id, directory, start, timeout):
+    report = {"name": node.get("name", session_id), "session_id": session_id,
+              "created": time.perf_counter() - start}
+    command = node.get("command", "")
+    if directory:
+        cd = f"cd {shlex.quote(directory)}"
+        command = f"{cd} && {command}" if command else cd
+    if command:
+        await api.async_send_text(session_id, command + "\n")
+    report["sent"] = time.perf_counter() - start
+
+    report["ready"] = report["sent"]
+    if node.get("ready"):
+        try:
+            await asyncio.wait_for(
+                api.async_wait_for_text(session_id, node["ready"]), timeout
+            )
+            report["ready"] = time.perf_counter() - start
+        except asyncio.TimeoutError:
+            report["ready"] = None
+    return [report]
+
+
+async def _async_node(api, node, session_id, directory, start, timeout):
+    if "split" not in node:
+        return await _async_pane(api, node, session_id, directory, start, timeout)
+
+    children = node["panes"]
+    vertical = node["split"] == "vertical"
+    # Every split lands right after session_id, so the first one issued
+    # ends up last: issue them all at once and hand them out in reverse.
+    new_ids = await asyncio.gather(*(
+        api.async_split_pane(session_id, vertical) for _ in children[1:]
+    ))
+    session_ids = [session_id] + list(reversed(new_ids))
+    if len(session_ids) > 2:
+        await api.async_equalize_panes(session_ids, vertical)
+
+    reports = await asyncio.gather(*(
+        _async_node(api, child, sid, directory, start, timeout)
+        for child, sid in zip(children, session_ids)
+    ))
+    return [pane for report in reports for pane in report]
+
+
+async def async_build(api, layout=STANDARD_WORKSPACE, directory=None,
+                      profile=None, timeout=READY_TIMEOUT):
+    """Open a window laid out as layout; return per-pane timing reports
+
+    Times are seconds since the build started; "ready" is None if the
+    pane's ready regex did not show up within timeout.
+    """
+    start = time.perf_counter()
+    root = await api.async_create_window(profile)
+    return await _async_node(api, layout, root, directory, start, timeout)
+
+
+def print_report(panes):
+    for pane in panes:
+        if pane["ready"] is None:
+            print(f"⚠️  {pane['name']}: not ready (created "
+                  f"{pane['created'] * 1000:.0f}ms)")
+        else:
+            print(f"✓ {pane['name']}: ready at {pane['ready'] * 1000:.0f}ms "
+                  f"(created {pane['created'] * 1000:.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=None,
+                        help="project directory every pane starts in")
+    parser.add_argument("--layout", help="JSON layout tree (default: "
+                        "Claude | Tests / Dev Server)")
+    parser.add_argument("--profile", help="profile for the new window")
+    parser.add_argument("--timeout", type=float, default=READY_TIMEOUT,
+                        help="seconds to wait for ready text")
+    args = parser.parse_args()
+
+    layout = STANDARD_WORKSPACE
+    if args.layout:
+        with open(args.layout) as f:
+            layout = json.load(f)
+    directory = os.path.abspath(args.directory) if args.directory else None
+
+    import ws_api
+    import ws_trace
+
+    async def run(connection):
+        panes = await async_build(ws_trace.wrap(ws_api.ITerm2API(connection)),
+                                  layout, directory, args.profile, args.timeout)
+        print_report(panes)
+        if any(p["ready"] is None for p in panes):
+            sys.exit(1)
+
+    ws_trace.run_until_complete(run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+WalterSignal output monitor
+Runs the profile's trigger regexes over session output from Python, so
+matches can be counted, rate-limited and forwarded instead of only
+highlighted.
+
+New lines are read once each by line number (see
+ITerm2API.async_stream_lines). Each batch is searched with one combined
+regex; only lines it hits are checked against the individual triggers.
+Events go through a bounded queue: when the consumer falls behind, the
+reader waits and catches up by line number rather than dropping events.
+iTerm2 never waits on us; lines are lost only if they leave the
+scrollback first, and those are counted.
+
+Usage: ws_monitor.py [SESSION_ID...] [--window S] [--jsonl] [--spec FILE]
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import sys
+import time
+
+import ws_triggers
+
+QUEUE_SIZE = 10000
+GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def scoped(regex):
+    """Turn "(?i)x" into "(?i:x)" so the regex can sit inside an alternation"""
+    match = GLOBAL_FLAGS.match(regex)
+    if match:
+        return f"(?{match.group(1)}:{regex[match.end():]})"
+    return regex
+
+
+class TriggerSet:
+    """Trigger regexes compiled for one pass over a batch of lines"""
+
+    def __init__(self, triggers):
+        self.triggers = [ws_triggers.iterm_trigger(t) for t in triggers]
+        self.patterns = [re.compile(scoped(t["regex"])) for t in self.triggers]
+        self.combined = re.compile(
+            "|".join(f"(?:{scoped(t['regex'])})" for t in self.triggers),
+            re.MULTILINE,
+        )
+
+    def scan(self, lines):
+        """Return [(line index, trigger)] for every trigger hit in lines"""
+        text = "\n".join(lines)
+        starts = []
+        offset = 0
+        for line in lines:
+            starts.append(offset)
+            offset += len(line) + 1
+
+        hits = []
+        search = self.combined.search
+        match = search(text)
+        while match:
+            index = bisect.bisect_right(starts, match.start()) - 1
+            line = lines[index]
+            for trigger, pattern in zip(self.triggers, self.patterns):
+                if pattern.search(line):
+                    hits.append((index, trigger))
+            # A match may run across a newline; carry on from the next line
+            if index + 1 >= len(lines):
+                break
+            match = search(text, starts[index + 1])
+        return hits
+
+
+class Monitor:
+    """Feeds trigger events from sessions into a bounded queue"""
+
+    def __init__(self, api, triggers, maxsize=QUEUE_SIZE):
+        self.api = api
+        self.triggers = TriggerSet(triggers)
+        self.queue = asyncio.Queue(maxsize)
+        self.stats = {"lines": 0, "events": 0, "lost": 0, "batches": 0}
+
+    async def async_watch(self, session_id):
+        async for numbers, lines, lost in self.api.async_stream_lines(session_id):
+            self.stats["lost"] += lost
+            self.stats["lines"] += len(lines)
+            self.stats["batches"] += 1
+            now = time.time()
+            for index, trigger in self.triggers.scan(lines):
+                self.stats["events"] += 1
+                # Blocks only this reader; unread lines wait in iTerm2
+                await self.queue.put({
+                    "session_id": session_id,
+                    "line_number": numbers[index],
+                    "line": lines[index],
+                    "regex": trigger["regex"],
+                    "action": trigger["action"],
+                    "time": now,
+                })
+
+    async def async_run(self, session_ids):
+        await asyncio.gather(*(self.async_watch(s) for s in session_ids))
+
+
+async def async_windows(queue, window):
+    """Yield {regex: {"count", "first"}} once per window seconds with events
+
+    Aggregates bursts (e.g. thousands of "error" lines) into one summary.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        event = await queue.get()
+        deadline = loop.time() + window
+        summary = {}
+        while True:
+            entry = summary.setdefault(event["regex"], {"count": 0, "first": event})
+            entry["count"] += 1
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+        yield summary
+
+
+async def async_print_events(queue, jsonl=False, window=2.0):
+    """Print events as JSON lines, or as one summary per window seconds"""
+    if jsonl:
+        while True:
+            print(json.dumps(await queue.get(), ensure_ascii=False), flush=True)
+    async for summary in async_windows(queue, window):
+        for regex, entry in summary.items():
+            print(f"{entry['count']:6} × {regex}  "
+                  f"first: {entry['first']['line'][:60]}", flush=True)
+
+
+def current_session_id():
+    """This terminal's session id from $ITERM_SESSION_ID (w0t0p0:UUID)"""
+    value = os.environ.get("ITERM_SESSION_ID", "")
+    return value.split(":", 1)[1] if ":" in value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sessions", nargs="*",
+                        help="session ids (default: this terminal)")
+    parser.add_argument("--window", type=float, default=2.0,
+                        help="seconds of events per summary")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="print every event as a JSON line")
+    parser.add_argument("--spec", default=ws_triggers.DEFAULT_SPEC)
+    args = parser.parse_args()
+
+    session_ids = args.sessions or [current_session_id()]
+    if None in session_ids:
+        print("✗ No session id given and not running inside iTerm2")
+        sys.exit(2)
+    triggers = ws_triggers.load_triggers(args.spec)
+    try:
+        ws_triggers.validate(triggers)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    import ws_api
+    import ws_trace
+
+    async def run(connection):
+        monitor = Monitor(ws_trace.wrap(ws_api.ITerm2API(connection)), triggers)
+        reader = asyncio.ensure_future(monitor.async_run(session_ids))
+        printer = asyncio.ensure_future(
+            async_print_events(monitor.queue, args.jsonl, args.window)
+        )
+        # The printer only ever waits on the queue; watch the reader too so
+        # a closed or unknown session ends the run instead of hanging it
+        done, pending = await asyncio.wait(
+            [reader, printer], return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        try:
+            for task in done:
+                task.result()
+        except KeyError as e:
+            print(f"✗ {e.args[0]}")
+            sys.exit(1)
+
+    ws_trace.run_until_complete(run)
+
+
+if __name__ == "__main__":
+    main()
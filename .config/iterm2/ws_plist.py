@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+WalterSignal plist index
+Streaming reader for com.googlecode.iterm2.plist.
+
+The plist is scanned with expat (no element tree) to find where each
+profile under "New Bookmarks" starts and ends. Offsets, names and a hash
+of each profile's bytes are kept in an on-disk index, so a later run can
+seek straight to one profile and parse just that slice. After an edit the
+file is rescanned, but only profiles whose bytes changed are re-parsed.
+
+Usage: ws_plist.py list
+       ws_plist.py show NAME|GUID
+       ws_plist.py verify [SPEC.json]
+"""
+
+import argparse
+import collections.abc
+import hashlib
+import json
+import os
+import plistlib
+import sys
+import time
+from xml.parsers import expat
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PLIST = os.path.join(HERE, "com.googlecode.iterm2.plist")
+DEFAULT_SPEC = os.path.join(HERE, "waltersignal-profile.json")
+CACHE_DIR = os.path.expanduser("~/.cache/waltersignal")
+INDEX_VERSION = 1
+
+
+def scan(data):
+    """Return [{"guid", "name", "start", "end"}] for each profile in data
+
+    data is the raw XML plist. start/end are byte offsets of the profile's
+    <dict>...</dict> element.
+    """
+    parser = expat.ParserCreate()
+    profiles = []
+    # depth: 1 plist, 2 top-level dict, 3 New Bookmarks array, 4 profile dict
+    state = {"depth": 0, "top_key": None, "in_bookmarks": False,
+             "profile": None, "key": None, "text": None}
+
+    def start(tag, _attrs):
+        state["depth"] += 1
+        depth = state["depth"]
+        if depth == 3 and tag == "array" and state["top_key"] == "New Bookmarks":
+            state["in_bookmarks"] = True
+        elif depth == 4 and state["in_bookmarks"] and tag == "dict":
+            state["profile"] = {"guid": None, "name": None,
+                                "start": parser.CurrentByteIndex}
+        if tag in ("key", "string"):
+            state["text"] = []
+
+    def end(tag):
+        depth = state["depth"]
+        state["depth"] -= 1
+        text = "".join(state["text"]) if state["text"] is not None else None
+        state["text"] = None
+        if depth == 3 and tag == "key":
+            state["top_key"] = text
+        elif depth == 3 and state["in_bookmarks"]:
+            state["in_bookmarks"] = False
+        elif depth == 5 and state["profile"] is not None:
+            if tag == "key":
+                state["key"] = text
+            elif tag == "string" and state["key"] in ("Guid", "Name"):
+                state["profile"][state["key"].lower()] = text
+            if tag != "key":
+                state["key"] = None
+        elif depth == 4 and state["profile"] is not None:
+            profile = state["profile"]
+            profile["end"] = data.index(b">", parser.CurrentByteIndex) + 1
+            profiles.append(profile)
+            state["profile"] = None
+
+    def chars(text):
+        if state["text"] is not None:
+            state["text"].append(text)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = chars
+    parser.Parse(data, True)
+    return profiles
+
+
+def parse_profile(chunk):
+    """Parse one <dict>...</dict> slice of the plist"""
+    return plistlib.loads(b'<plist version="1.0">' + chunk + b"</plist>")
+
+
+class PlistIndex(collections.abc.Mapping):
+    """Lazy Guid -> profile view over an iTerm2 XML plist"""
+
+    def __init__(self, path=DEFAULT_PLIST, index_path=None):
+        self.path = os.path.abspath(path)
+        if index_path is None:
+            tag = hashlib.sha1(self.path.encode()).hexdigest()[:8]
+            index_path = os.path.join(
+                CACHE_DIR, f"{os.path.basename(self.path)}.{tag}.json"
+            )
+        self.index_path = index_path
+        self.index = self._load_index()
+        self.parsed = {}  # sha1 -> parsed profile, survives rescans
+        self.refresh()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return index if index.get("version") == INDEX_VERSION else None
+
+    def _save_index(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self):
+        """Rescan if the file changed; return the Guids whose bytes changed"""
+        mtime_ns, size = self._stat()
+        if (self.index and self.index["mtime_ns"] == mtime_ns
+                and self.index["size"] == size):
+            return []
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.lstrip().startswith((b"<?xml", b"<plist")):
+            raise ValueError(f"{self.path} is not an XML plist")
+
+        old = {p["guid"]: p["sha1"] for p in self.index["profiles"]} if self.index else {}
+        profiles = scan(data)
+        for p in profiles:
+            p["sha1"] = hashlib.sha1(data[p["start"]:p["end"]]).hexdigest()
+        live = {p["sha1"] for p in profiles}
+        self.parsed = {h: v for h, v in self.parsed.items() if h in live}
+
+        self.index = {"version": INDEX_VERSION, "mtime_ns": mtime_ns,
+                      "size": size, "profiles": profiles}
+        self._save_index()
+        return [p["guid"] for p in profiles if old.get(p["guid"]) != p["sha1"]]
+
+    def _profiles(self):
+        """Index entries, rescanning first if the plist changed"""
+        self.refresh()
+        return self.index["profiles"]
+
+    def _entry(self, guid):
+        for p in self._profiles():
+            if p["guid"] == guid:
+                return p
+        raise KeyError(guid)
+
+    def find(self, name):
+        """Guid of the first profile called name, or None"""
+        for p in self._profiles():
+            if p["name"] == name:
+                return p["guid"]
+        return None
+
+    def names(self):
+        return {p["guid"]: p["name"] for p in self._profiles()}
+
+    def __getitem__(self, guid):
+        entry = self._entry(guid)
+        profile = self.parsed.get(entry["sha1"])
+        if profile is None:
+            with open(self.path, "rb") as f:
+                f.seek(entry["start"])
+                profile = parse_profile(f.read(entry["end"] - entry["start"]))
+            self.parsed[entry["sha1"]] = profile
+        return profile
+
+    def __contains__(self, guid):
+        return any(p["guid"] == guid for p in self._profiles())
+
+    def __iter__(self):
+        return iter([p["guid"] for p in self._profiles()])
+
+    def __len__(self):
+        return len(self._profiles())
+
+
+def verify(index, spec):
+    """Print ✓/✗ per spec setting for the spec's profile; True if all match"""
+    import ws_apply
+    import ws_triggers
+
+    desired = dict(spec)
+    if "Triggers" in desired:
+        desired["Triggers"] = ws_triggers.iterm_triggers(desired["Triggers"])
+
+    guid = index.find(spec["Name"])
+    if guid is None:
+        print(f"✗ Profile '{spec['Name']}' not in {index.path}")
+        return False
+    print(f"✓ Found profile '{spec['Name']}' ({guid})")
+
+    changes = ws_apply.diff(index[guid], desired)
+    for key in desired:
+        if key in ws_apply.SPEC_ONLY_KEYS:
+            continue
+        print(f"{'✗' if key in changes else '✓'} {key}")
+    return not changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plist", default=DEFAULT_PLIST)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Guid and name of every profile")
+    show_parser = sub.add_parser("show", help="one profile as JSON")
+    show_parser.add_argument("profile", help="name or Guid")
+    verify_parser = sub.add_parser("verify", help="compare a profile with its spec")
+    verify_parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    # Exit codes: 0 ok, 1 profile missing or differs from spec, 2 error
+    try:
+        index = PlistIndex(args.plist)
+
+        if args.command == "list":
+            for guid, name in index.names().items():
+                print(f"{guid:40} {name}")
+        elif args.command == "show":
+            guid = args.profile if args.profile in index else index.find(args.profile)
+            if guid is None:
+                print(f"✗ No profile '{args.profile}'")
+                sys.exit(1)
+            print(json.dumps(index[guid], indent=2, sort_keys=True, default=str))
+        elif args.command == "verify":
+            with open(args.spec) as f:
+                ok = verify(index, json.load(f))
+            print(f"  ({(time.perf_counter() - start) * 1000:.1f}ms)")
+            sys.exit(0 if ok else 1)
+    except (OSError, ValueError, expat.ExpatError) as e:
+        # ValueError covers plistlib.InvalidFileException
+        print(f"✗ {e}")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+WalterSignal profile resolver
+Finds profiles by name without pulling every profile's properties.
+
+Only "Guid" and "Name" are queried to build the index; full properties
+are fetched for the one profile asked for. The index is kept in memory
+and dropped when iTerm2 reports a change to a profile we handed out.
+"""
+
+INDEX_PROPERTIES = ["Guid", "Name"]
+
+
+class ProfileResolver:
+    """Cached name/Guid index over the profiles iTerm2 knows about"""
+
+    def __init__(self, api, watch=True):
+        self.api = api
+        self.watch = watch
+        self.by_guid = None
+        self.by_name = None
+        self.subscriptions = {}
+
+    def invalidate(self, guid=None):
+        """Forget the index; the next lookup re-queries names and Guids"""
+        self.by_guid = None
+        self.by_name = None
+
+    async def async_refresh(self):
+        profiles = await self.api.async_list_profiles(INDEX_PROPERTIES)
+        by_guid = {}
+        by_name = {}
+        for p in profiles:
+            by_guid[p["Guid"]] = p.get("Name")
+            # First match wins, like the old linear scan
+            by_name.setdefault(p.get("Name"), p["Guid"])
+        self.by_guid = by_guid
+        self.by_name = by_name
+
+    async def _async_watch(self, guid):
+        if self.watch and guid not in self.subscriptions:
+            self.subscriptions[guid] = await self.api.async_subscribe_to_profile_changes(
+                guid, self.invalidate
+            )
+
+    async def async_guid_for_name(self, name):
+        """Return the Guid of the profile called name, or None
+
+        A miss re-queries the index once, so profiles added since the
+        last refresh (e.g. new dynamic profiles) are still found.
+        """
+        if self.by_name is None or name not in self.by_name:
+            await self.async_refresh()
+        guid = self.by_name.get(name)
+        if guid is not None:
+            await self._async_watch(guid)
+        return guid
+
+    async def async_get_profile(self, name):
+        """Return all properties of the profile called name, or None"""
+        guid = await self.async_guid_for_name(name)
+        if guid is None:
+            return None
+        profile = await self.api.async_get_profile(guid)
+        if profile is None or profile.get("Name") != name:
+            # Deleted or renamed without a notification reaching us
+            self.invalidate()
+            guid = await self.async_guid_for_name(name)
+            if guid is None:
+                return None
+            profile = await self.api.async_get_profile(guid)
+        return profile
+
+    async def async_close(self):
+        for token in self.subscriptions.values():
+            await self.api.async_unsubscribe(token)
+        self.subscriptions = {}
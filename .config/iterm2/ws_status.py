@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+WalterSignal status cache
+Answers dashboard questions from the n8n SQLite store and ~/.claude.json
+quickly enough for an iTerm2 status-bar component.
+
+The n8n database is opened read-only (mode=ro, query_only) and never
+written, so n8n keeps its lock. Connections come from a small pool and
+the queries are module constants, so each connection's statement cache
+prepares them once. Query results and the parsed .claude.json sections
+are kept until the file's mtime or size changes. A warm lookup therefore
+costs a couple of stat() calls.
+
+Nothing here waits on n8n: the busy timeout is BUSY_TIMEOUT, and while
+the database is locked the last results are served again. A half-written
+.claude.json likewise leaves the last good sections in place.
+
+Usage: ws_status.py [line|executions|claude] [--json] [--limit N]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import sys
+import time
+import urllib.parse
+
+N8N_DB = os.environ.get("WS_N8N_DB", os.path.expanduser("~/.n8n/database.sqlite"))
+CLAUDE_JSON = os.environ.get("WS_CLAUDE_JSON", os.path.expanduser("~/.claude.json"))
+CLAUDE_SECTIONS = ("projects", "mcpServers", "skillUsage")
+POOL_SIZE = 4
+BUSY_TIMEOUT = 0.02  # seconds; status callbacks run on the daemon's loop
+RECENT_LIMIT = 10
+WINDOW_HOURS = 24
+
+RECENT_EXECUTIONS = """
+    SELECT e.id, e.workflowId, w.name, e.status, e.mode, e.startedAt, e.stoppedAt
+    FROM execution_entity e LEFT JOIN workflow_entity w ON w.id = e.workflowId
+    WHERE e.deletedAt IS NULL
+    ORDER BY e.id DESC LIMIT ?
+"""
+# stoppedAt is indexed (IDX_execution_entity_stoppedAt), startedAt is not
+STATUS_COUNTS = """
+    SELECT status, COUNT(*) FROM execution_entity
+    WHERE deletedAt IS NULL AND stoppedAt >= ?
+    GROUP BY status
+"""
+EXECUTION_COLUMNS = ("id", "workflow_id", "workflow", "status", "mode",
+                     "started", "stopped")
+
+
+def signature(*paths):
+    """(mtime_ns, size) per path, None for missing ones"""
+    result = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            result.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            result.append(None)
+    return tuple(result)
+
+
+class ConnectionPool:
+    """Read-only SQLite connections, reused across calls and threads"""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.uri = "file:" + urllib.parse.quote(path) + "?mode=ro"
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(self.uri, uri=True, timeout=BUSY_TIMEOUT,
+                               check_same_thread=False, cached_statements=32)
+        conn.execute("PRAGMA query_only = ON")
+        self.opened += 1
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if self.idle.qsize() < self.size:
+                self.idle.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class N8nStore:
+    """Cached queries over n8n's execution history"""
+
+    def __init__(self, path=N8N_DB, pool_size=POOL_SIZE):
+        self.path = path
+        # With WAL on, commits land in -wal before the main file changes
+        self.paths = (path, path + "-wal")
+        self.pool = ConnectionPool(path, pool_size)
+        self.signature = None
+        self.results = {}
+        self.stale = {}  # results from before the last change, for busy reads
+        self.stats = {"queries": 0, "hits": 0, "stale": 0}
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def query(self, sql, params=(), latest_only=False):
+        """Rows for sql, re-run only after the database files change
+
+        With latest_only, results cached for sql with other params are
+        dropped, for params that move on over time and never come back.
+        While n8n holds the lock, the result from before its write is
+        returned (if there is one) and the query is retried next call.
+        """
+        current = signature(*self.paths)
+        if current != self.signature:
+            self.signature = current
+            self.stale.update(self.results)
+            self.results = {}
+        key = (sql, params)
+        if key in self.results:
+            self.stats["hits"] += 1
+            return self.results[key]
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            if key not in self.stale:
+                raise
+            self.stats["stale"] += 1
+            return self.stale[key]
+        self.stale.pop(key, None)
+        self.stats["queries"] += 1
+        if latest_only:
+            self.results = {k: v for k, v in self.results.items() if k[0] != sql}
+            self.stale = {k: v for k, v in self.stale.items() if k[0] != sql}
+        self.results[key] = rows
+        return rows
+
+    def journal_mode(self):
+        with self.pool.connection() as conn:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+    def recent_executions(self, limit=RECENT_LIMIT):
+        return [dict(zip(EXECUTION_COLUMNS, row))
+                for row in self.query(RECENT_EXECUTIONS, (limit,))]
+
+    def status_counts(self, hours=WINDOW_HOURS):
+        """{status: count} for executions that stopped in the last hours"""
+        # Rounded to the minute so repeated calls share one cached result
+        since = time.gmtime((int(time.time()) // 60 * 60) - hours * 3600)
+        rows = self.query(STATUS_COUNTS, (time.strftime("%Y-%m-%d %H:%M:%S", since),),
+                          latest_only=True)
+        return dict(rows)
+
+    def close(self):
+        self.pool.close()
+
+
+class ClaudeConfig:
+    """The .claude.json sections the dashboard uses, parsed once per change"""
+
+    def __init__(self, path=CLAUDE_JSON, sections=CLAUDE_SECTIONS):
+        self.path = path
+        self.wanted = sections
+        self.signature = None
+        self.cache = {name: {} for name in sections}
+        self.error = None
+        self.stats = {"parses": 0, "hits": 0}
+
+    def sections(self):
+        """The wanted sections; the last good ones if the file is unreadable
+
+        error holds the reason while the file cannot be parsed (Claude
+        rewrites it in place, so a read can catch it half-written).
+        """
+        current = signature(self.path)
+        if current == self.signature:
+            self.stats["hits"] += 1
+            return self.cache
+        try:
+            if current == (None,):
+                data = {}
+            else:
+                with open(self.path, "rb") as f:
+                    data = json.load(f)
+                self.stats["parses"] += 1
+            if not isinstance(data, dict):
+                raise ValueError("top level is not an object")
+        except (OSError, ValueError) as e:
+            # Signature left alone, so the next call tries again
+            self.error = f"{self.path}: {e}"
+            return self.cache
+        self.cache = {name: data.get(name) or {} for name in self.wanted}
+        self.signature = current
+        self.error = None
+        return self.cache
+
+    def section(self, name):
+        return self.sections()[name]
+
+
+class Status:
+    """Status summaries over both sources"""
+
+    def __init__(self, n8n_path=N8N_DB, claude_path=CLAUDE_JSON):
+        self.n8n = N8nStore(n8n_path)
+        self.claude = ClaudeConfig(claude_path)
+
+    def executions(self, limit=RECENT_LIMIT, hours=WINDOW_HOURS):
+        """{"recent": [...], "counts": {status: n}} or None without n8n"""
+        if not self.n8n.available():
+            return None
+        try:
+            return {"recent": self.n8n.recent_executions(limit),
+                    "counts": self.n8n.status_counts(hours)}
+        except sqlite3.Error as e:
+            return {"error": str(e)}
+
+    def claude_summary(self, cwd=None):
+        sections = self.claude.sections()
+        project = sections["projects"].get(cwd or os.getcwd(), {})
+        skills = sections["skillUsage"]
+        recent = max(skills, key=lambda s: skills[s].get("lastUsedAt", 0),
+                     default=None)
+        summary = {
+            "projects": len(sections["projects"]),
+            "mcp_servers": sorted(sections["mcpServers"]),
+            "project_mcp_servers": sorted(project.get("mcpServers", {})),
+            "skills": len(skills),
+            "last_skill": recent,
+        }
+        if self.claude.error:
+            summary["error"] = self.claude.error
+        return summary
+
+    def summary(self, cwd=None, limit=RECENT_LIMIT):
+        return {"n8n": self.executions(limit), "claude": self.claude_summary(cwd)}
+
+    def line(self, cwd=None):
+        """One short line for a status bar or badge"""
+        parts = []
+        executions = self.executions(limit=1)
+        if executions and "error" not in executions:
+            counts = executions["counts"]
+            failed = counts.get("error", 0) + counts.get("crashed", 0)
+            if counts:
+                text = f"n8n ✓{counts.get('success', 0)}"
+                if failed:
+                    text += f" ✗{failed}"
+                parts.append(text)
+            elif executions["recent"]:
+                ok = executions["recent"][0]["status"] == "success"
+                parts.append(f"n8n last {'✓' if ok else '✗'}")
+        claude = self.claude_summary(cwd)
+        servers = len(claude["mcp_servers"]) + len(claude["project_mcp_servers"])
+        parts.append(f"mcp {servers}")
+        if claude["last_skill"]:
+            parts.append(f"/{claude['last_skill']}")
+        if "error" in claude:
+            parts.append("claude.json ✗")
+        return " · ".join(parts)
+
+    def close(self):
+        self.n8n.close()
+
+
+def print_executions(executions, file=None):
+    if executions is None:
+        print(f"⚠️  No n8n database at {N8N_DB}", file=file)
+        return
+    if "error" in executions:
+        print(f"✗ n8n: {executions['error']}", file=file)
+        return
+    counts = ", ".join(f"{n} {s}" for s, n in sorted(executions["counts"].items()))
+    print(f"Last {WINDOW_HOURS}h: {counts or 'no executions'}", file=file)
+    for e in executions["recent"]:
+        mark = "✓" if e["status"] == "success" else "✗" if e["status"] in (
+            "error", "crashed") else "·"
+        print(f"  {mark} #{e['id']:<5} {e['started'] or '':23}  "
+              f"{e['workflow'] or e['workflow_id']} ({e['mode']})", file=file)
+
+
+def print_claude(claude, file=None):
+    if "error" in claude:
+        print(f"⚠️  {claude['error']} (showing the last good read, if any)",
+              file=file)
+    print(f"Projects:    {claude['projects']}", file=file)
+    print(f"MCP servers: {', '.join(claude['mcp_servers']) or 'none'}", file=file)
+    if claude["project_mcp_servers"]:
+        print(f"  this project: {', '.join(claude['project_mcp_servers'])}",
+              file=file)
+    print(f"Skills used: {claude['skills']} "
+          f"(last: {claude['last_skill'] or '-'})", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("what", nargs="?", default="line",
+                        choices=("line", "executions", "claude"))
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--limit", type=int, default=RECENT_LIMIT,
+                        help="recent executions to show")
+    args = parser.parse_args()
+
+    status = Status()
+    if args.what == "line":
+        result = status.line()
+    elif args.what == "executions":
+        result = status.executions(args.limit)
+    else:
+        result = status.claude_summary()
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.what == "line":
+        print(result)
+    elif args.what == "executions":
+        print_executions(result)
+        if result and "error" in result:
+            sys.exit(1)
+    else:
+        print_claude(result)
+
+
+if __name__ == "__main__":
+    main()
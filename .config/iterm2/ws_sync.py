@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+WalterSignal profile sync
+Brings iTerm2 profiles in line with a directory of JSON specs.
+
+Specs use the waltersignal-profile.json format, one profile per file.
+Every profile is planned as create / update / no-op, the plan is printed
+Terraform-style, then all profiles are applied concurrently with a cap on
+API calls in flight.
+
+Usage: ws_sync.py [DIR] [--dry-run] [--max-in-flight N]
+
+DIR defaults to ~/.config/iterm2/profiles.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+
+import ws_api
+import ws_apply
+import ws_profiles
+import ws_triggers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Its own directory: the tools directory also holds non-profile JSON
+PROFILES_DIR = os.path.join(HERE, "profiles")
+MAX_IN_FLIGHT = 8
+
+
+class LimitedAPI:
+    """Wraps an API object so at most limit calls are in flight at once
+
+    Each property write takes its own slot (see
+    ws_api.async_set_profile_properties).
+    """
+
+    def __init__(self, api, limit=MAX_IN_FLIGHT):
+        self.api = api
+        self.semaphore = asyncio.Semaphore(limit)
+
+    def __getattr__(self, name):
+        method = getattr(self.api, name)
+
+        async def limited(*args, **kwargs):
+            async with self.semaphore:
+                return await method(*args, **kwargs)
+
+        return limited
+
+
+def load_spec(path):
+    """Read one spec file; triggers are validated and converted here"""
+    with open(path) as f:
+        spec = json.load(f)
+    if "Triggers" in spec:
+        spec["Triggers"] = ws_triggers.iterm_triggers(spec["Triggers"])
+    return spec
+
+
+def load_specs(directory):
+    specs = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        spec = load_spec(path)
+        if "Name" in spec:
+            specs.append(spec)
+    return specs
+
+
+async def async_plan(api, specs):
+    """Return [{"name", "action", "guid", "current", "changes"}] per spec
+
+    One Name/Guid query finds existing profiles; their full properties are
+    then fetched together.
+    """
+    resolver = ws_profiles.ProfileResolver(api, watch=False)
+    await resolver.async_refresh()
+
+    async def plan_one(spec):
+        guid = resolver.by_name.get(spec["Name"])
+        current = None if guid is None else await api.async_get_profile(guid)
+        if current is None:
+            changes = ws_apply.diff({}, spec)
+            action = "create"
+        else:
+            changes = ws_apply.diff(current, spec)
+            action = "update" if changes else "no-op"
+        return {"name": spec["Name"], "action": action, "guid": guid,
+                "current": current or {}, "changes": changes}
+
+    return await asyncio.gather(*(plan_one(spec) for spec in specs))
+
+
+async def async_apply_plan(api, plan):
+    """Apply every create/update concurrently; fills in "seconds" per entry"""
+
+    async def apply_one(entry):
+        start = time.perf_counter()
+        if entry["action"] == "create":
+            entry["guid"] = await api.async_create_profile(entry["name"])
+        if entry["changes"]:
+            await ws_api.async_set_profile_properties(
+                api, entry["guid"], entry["changes"]
+            )
+        entry["seconds"] = time.perf_counter() - start
+
+    await asyncio.gather(*(apply_one(entry) for entry in plan))
+    return plan
+
+
+def _short(value, width=50):
+    text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def print_plan(plan):
+    symbols = {"create": "+", "update": "~", "no-op": "="}
+    for entry in plan:
+        print(f"  {symbols[entry['action']]} {entry['name']}"
+              f"  ({entry['action']}, {len(entry['changes'])} settings)")
+        if entry["action"] == "update":
+            for key, value in entry["changes"].items():
+                before = entry["current"].get(key)
+                print(f"      ~ {key}: {_short(before)} -> {_short(value)}")
+    counts = {a: sum(e["action"] == a for e in plan) for a in symbols}
+    print("")
+    print(f"Plan: {counts['create']} to create, {counts['update']} to update, "
+          f"{counts['no-op']} unchanged.")
+
+
+def print_applied(plan, seconds):
+    for entry in plan:
+        if entry["action"] != "no-op":
+            print(f"✓ {entry['name']}: {entry['action']} "
+                  f"in {entry['seconds'] * 1000:.0f}ms")
+    print(f"✓ Synced {len(plan)} profiles in {seconds * 1000:.0f}ms")
+
+
+async def async_sync(api, specs, dry_run=False, max_in_flight=MAX_IN_FLIGHT):
+    """Plan, print and (unless dry_run) apply specs; returns the plan"""
+    api = LimitedAPI(api, max_in_flight)
+    start = time.perf_counter()
+    plan = await async_plan(api, specs)
+    print_plan(plan)
+    if dry_run or all(e["action"] == "no-op" for e in plan):
+        return plan
+    print("")
+    await async_apply_plan(api, plan)
+    print_applied(plan, time.perf_counter() - start)
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=PROFILES_DIR)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the plan without changing anything")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help="API calls allowed in flight at once")
+    args = parser.parse_args()
+
+    try:
+        specs = load_specs(args.directory)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    if not specs:
+        print(f"✗ No profile specs in {args.directory}")
+        sys.exit(1)
+
+    import ws_api
+    import ws_trace
+
+    async def run(connection):
+        await async_sync(ws_trace.wrap(ws_api.ITerm2API(connection)), specs,
+                         args.dry_run, args.max_in_flight)
+
+    ws_trace.run_until_complete(run)
+
+
+if __name__ == "__main__":
+    main()
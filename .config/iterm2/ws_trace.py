@@ -0,0 +1,158 @@
+"""
+WalterSignal tracing
+Records API calls, imports and connection setup as a Chrome trace.
+
+Set WS_TRACE=/path/to/trace.json to trace any of the tools; open the file
+in Perfetto, chrome://tracing or speedscope. Each API call is a span with
+its duration and request/response size; calls in flight at the same time
+are drawn on separate lanes so they read as a flame graph.
+"""
+
+import atexit
+import contextlib
+import inspect
+import json
+import os
+import time
+
+TRACE_PATH = os.environ.get("WS_TRACE")
+
+
+def payload_size(value):
+    """Bytes value would take as JSON (what the API sends, roughly)"""
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class Tracer:
+    """Collects complete ("X") trace events"""
+
+    def __init__(self, pid=None, origin=None):
+        self.events = []
+        self.pid = os.getpid() if pid is None else pid
+        self.origin = time.perf_counter() if origin is None else origin
+        self.lanes = []  # True where a call is in flight
+
+    def _us(self, seconds):
+        return (seconds - self.origin) * 1e6
+
+    def record(self, name, start, end, lane=0, **args):
+        self.events.append({
+            "name": name, "ph": "X", "pid": self.pid, "tid": lane,
+            "ts": self._us(start), "dur": (end - start) * 1e6, "args": args,
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    def _take_lane(self):
+        for lane, busy in enumerate(self.lanes):
+            if not busy:
+                self.lanes[lane] = True
+                return lane + 1
+        self.lanes.append(True)
+        return len(self.lanes)
+
+    def _free_lane(self, lane):
+        self.lanes[lane - 1] = False
+
+    def calls(self):
+        return [e for e in self.events if e["name"].startswith("api.")]
+
+    def summary(self):
+        """{"round_trips", "seconds", "sent", "received"} over all API calls"""
+        calls = self.calls()
+        return {
+            "round_trips": len(calls),
+            "seconds": sum(e["dur"] for e in calls) / 1e6,
+            "sent": sum(e["args"].get("sent", 0) for e in calls),
+            "received": sum(e["args"].get("received", 0) for e in calls),
+        }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events,
+                       "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+class TracingAPI:
+    """Wraps an API object, recording every coroutine call as a span"""
+
+    def __init__(self, api, tracer=tracer):
+        self.api = api
+        self.tracer = tracer
+
+    def __getattr__(self, name):
+        method = getattr(self.api, name)
+        if not inspect.iscoroutinefunction(method):
+            return method
+
+        async def traced(*args, **kwargs):
+            lane = self.tracer._take_lane()
+            start = time.perf_counter()
+            result = None
+            try:
+                result = await method(*args, **kwargs)
+                return result
+            finally:
+                self.tracer._free_lane(lane)
+                self.tracer.record(
+                    "api." + name.replace("async_", "", 1), start,
+                    time.perf_counter(), lane,
+                    sent=payload_size([args, kwargs]),
+                    received=payload_size(result),
+                )
+
+        return traced
+
+
+def wrap(api):
+    """TracingAPI(api) when WS_TRACE is set, else api unchanged"""
+    return TracingAPI(api) if TRACE_PATH else api
+
+
+def _run(runner_name, main):
+    with tracer.span("import iterm2"):
+        import iterm2
+    runner = getattr(iterm2, runner_name)
+    connect = time.perf_counter()
+
+    async def traced_main(connection):
+        # Time from calling the runner to main starting is connection setup
+        tracer.record("connect", connect, time.perf_counter())
+        with tracer.span("main"):
+            return await main(connection)
+
+    return runner(traced_main)
+
+
+def run_until_complete(main):
+    """iterm2.run_until_complete, traced when WS_TRACE is set"""
+    if not TRACE_PATH:
+        import iterm2
+
+        return iterm2.run_until_complete(main)
+    atexit.register(tracer.write, TRACE_PATH)
+    return _run("run_until_complete", main)
+
+
+def run_forever(main):
+    """iterm2.run_forever, traced when WS_TRACE is set"""
+    if not TRACE_PATH:
+        import iterm2
+
+        return iterm2.run_forever(main)
+    atexit.register(tracer.write, TRACE_PATH)
+    return _run("run_forever", main)
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+WalterSignal trigger tools
+Validates, installs and profiles the trigger regexes from
+waltersignal-profile.json.
+
+iTerm2 runs every trigger against every line of output, so a pattern that
+backtracks badly stalls the terminal on large build logs. Patterns are
+checked before they are installed, and `profile` replays a recorded log
+through the set to show what each one costs.
+
+Usage: ws_triggers.py check [SPEC.json]
+       ws_triggers.py profile LOGFILE [SPEC.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPEC = os.path.join(HERE, "waltersignal-profile.json")
+
+# waltersignal-profile.json action names -> iTerm2 trigger classes
+ACTIONS = {
+    "HighlightText": "HighlightTrigger",
+    "Alert": "AlertTrigger",
+    "PostNotification": "UserNotificationTrigger",
+}
+
+REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+META_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def load_triggers(path=DEFAULT_SPEC):
+    with open(path) as f:
+        return json.load(f).get("Triggers", [])
+
+
+def _hex(color):
+    return "#%02x%02x%02x" % tuple(
+        round(color[f"{c} Component"] * 255) for c in ("Red", "Green", "Blue")
+    )
+
+
+def iterm_trigger(trigger):
+    """Translate one spec trigger to the dict iTerm2 stores in "Triggers"
+
+    Actions and parameters already in iTerm2's format pass through.
+    """
+    action = ACTIONS.get(trigger["action"], trigger["action"])
+    parameter = trigger.get("parameter", "")
+    if isinstance(parameter, dict):
+        if action == "HighlightTrigger":
+            text = parameter.get("textColor")
+            background = parameter.get("backgroundColor")
+            parameter = "{%s,%s}" % (
+                _hex(text) if text else "",
+                _hex(background) if background else "",
+            )
+        elif "message" in parameter:
+            parameter = parameter["message"]
+    return {
+        "regex": trigger["regex"],
+        "action": action,
+        "parameter": parameter,
+        "partial": trigger.get("partial", False),
+    }
+
+
+# --- Backtracking checks -------------------------------------------------
+
+def _unbounded(av):
+    return av[1] == sre_parse.MAXREPEAT
+
+
+def _children(op, av):
+    if op in REPEATS or op == getattr(sre_parse, "POSSESSIVE_REPEAT", None):
+        return [av[2]]
+    if op == sre_parse.SUBPATTERN:
+        return [av[3]]
+    if op == sre_parse.BRANCH:
+        return av[1]
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return [av[1]]
+    if op == getattr(sre_parse, "ATOMIC_GROUP", None):
+        return [av]
+    if op == sre_parse.GROUPREF_EXISTS:
+        return [p for p in av[1:] if p is not None]
+    return []
+
+
+# Code points the char-set checks are evaluated over: Latin-1 plus a few
+# wider characters so classes like \w and \s are not mistaken for ASCII
+ALPHABET = frozenset(range(256)) | {0x2028, 0x3000, 0x4E00, 0x1F600}
+CATEGORIES = {
+    getattr(sre_parse, name): frozenset(
+        c for c in ALPHABET if re.fullmatch(regex, chr(c))
+    )
+    for name, regex in (
+        ("CATEGORY_DIGIT", r"\d"), ("CATEGORY_NOT_DIGIT", r"\D"),
+        ("CATEGORY_SPACE", r"\s"), ("CATEGORY_NOT_SPACE", r"\S"),
+        ("CATEGORY_WORD", r"\w"), ("CATEGORY_NOT_WORD", r"\W"),
+    )
+}
+# The checker must keep rejecting these (`check` fails if it stops)
+UNSAFE_EXAMPLES = (
+    r"(a+)+$",
+    r"(a|aa)*b",
+    r"(a|a)*$",
+    r"(.|\s)*x",
+    r"(\s|\S)*x",
+    r"(\w|\d)+$",
+    r"([a-z]|[a-z0-9])+$",
+    r"(\w+\s?)+$",
+    r"(.*a){20}",
+    r"(\d+){12}x",
+)
+# ... and keep accepting these
+SAFE_EXAMPLES = (
+    r"(\d+\.)+\d+",
+    r"(\w+\.)+\w+",
+    r"([a-z]+-)+[a-z]+",
+    r"(?:-\w*)+$",
+    r"(?:\s|,)+",
+    r"[\w\d]+$",
+    r"(\d{1,3}\.){3}\d{1,3}",
+    r"^\s*(ERROR|Error)\b",
+    r"(?i)(error|failed)",
+)
+
+# Group syntax _separate_alternatives copies through without opening an
+# alternative: inline flags (which must stay first), comments, backrefs
+FLAGS_GROUP = re.compile(r"\(\?[aiLmsux]+\)")
+OPAQUE_GROUP = re.compile(r"\(\?(?:#|P=)[^)]*\)")
+GROUP_HEADER = re.compile(
+    r"\((?:\?(?:[:=!>]|<[=!]|P<\w+>|[aiLmsux]*(?:-[imsx]+)?:|\(\w+\)))?")
+
+
+def _class_end(regex, i):
+    """Index just past the [...] class starting at regex[i]"""
+    j = i + 1
+    if regex.startswith("^", j):
+        j += 1
+    if regex.startswith("]", j):
+        j += 1
+    while j < len(regex) and regex[j] != "]":
+        j += 2 if regex[j] == "\\" else 1
+    return j + 1
+
+
+def _separate_alternatives(regex):
+    """regex with a distinct empty group opening every alternative
+
+    sre_parse merges single-char alternatives into one class ("(\\w|\\d)"
+    becomes "[\\w\\d]") and moves shared prefixes out of a branch ("(a|a)"
+    becomes "a(?:|)"). ICU, which runs iTerm2's triggers, does neither, so
+    the checks have to see the alternatives as written. Empty groups with
+    different numbers block both rewrites and match the same strings.
+    Returns None for group syntax this does not know.
+    """
+    out = []
+    opened = True  # an alternative starts at i
+    i = 0
+    while i < len(regex):
+        flags = FLAGS_GROUP.match(regex, i)
+        if flags:
+            out.append(flags.group())
+            i = flags.end()
+            continue
+        if opened:
+            out.append("()")
+            opened = False
+        c = regex[i]
+        if c == "\\":
+            out.append(regex[i:i + 2])
+            i += 2
+        elif c == "[":
+            end = _class_end(regex, i)
+            out.append(regex[i:end])
+            i = end
+        elif c == "|":
+            out.append(c)
+            i += 1
+            opened = True
+        elif c == "(":
+            opaque = OPAQUE_GROUP.match(regex, i)
+            if opaque:
+                out.append(opaque.group())
+                i = opaque.end()
+                continue
+            header = GROUP_HEADER.match(regex, i).group()
+            if header == "(" and regex.startswith("(?", i):
+                return None
+            out.append(header)
+            i += len(header)
+            opened = True
+        else:
+            out.append(c)
+            i += 1
+    if opened:
+        out.append("()")
+    return "".join(out)
+
+
+def _char_set(op, av):
+    """Chars (from ALPHABET) one char-matching item accepts, None if unknown"""
+    if op == sre_parse.LITERAL:
+        return {av}
+    if op == sre_parse.NOT_LITERAL:
+        return ALPHABET - {av}
+    if op == sre_parse.ANY:
+        return ALPHABET - {ord("\n")}
+    if op != sre_parse.IN:
+        return None
+    chars = set()
+    negate = False
+    for item, value in av:
+        if item == sre_parse.NEGATE:
+            negate = True
+        elif item == sre_parse.LITERAL:
+            chars.add(value)
+        elif item == sre_parse.RANGE:
+            chars |= {c for c in ALPHABET if value[0] <= c <= value[1]}
+        elif item == sre_parse.CATEGORY and value in CATEGORIES:
+            chars |= CATEGORIES[value]
+        else:
+            return None
+    return ALPHABET - chars if negate else chars
+
+
+def _first(pattern):
+    """(chars a subpattern can start with, whether it can match empty)
+
+    chars is None when it cannot be worked out; callers treat that as
+    "could be anything".
+    """
+    chars = set()
+    for op, av in pattern:
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        if op in REPEATS or op == getattr(sre_parse, "POSSESSIVE_REPEAT", None):
+            first, nullable = _first(av[2])
+            nullable = nullable or av[0] == 0
+        elif op == sre_parse.SUBPATTERN:
+            first, nullable = _first(av[3])
+        elif op == getattr(sre_parse, "ATOMIC_GROUP", None):
+            first, nullable = _first(av)
+        elif op == sre_parse.BRANCH:
+            first, nullable = set(), False
+            for alt in av[1]:
+                alt_first, alt_nullable = _first(alt)
+                if alt_first is None:
+                    return None, False
+                first |= alt_first
+                nullable = nullable or alt_nullable
+        else:
+            first, nullable = _char_set(op, av), False
+        if first is None:
+            return None, False
+        chars |= first
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def _items(pattern):
+    """pattern's items without empty groups, unwrapped if it is one group"""
+    items = [(op, av) for op, av in pattern
+             if not (op == sre_parse.SUBPATTERN and not av[3])]
+    if len(items) == 1 and items[0][0] == sre_parse.SUBPATTERN:
+        return _items(items[0][1][3])
+    return items
+
+
+def _overlapping_branch(pattern):
+    """True if two alternatives of a branch can start the same way
+
+    Alternatives whose first chars are unknown count as overlapping, and
+    so do two that can both match nothing.
+    """
+    for op, av in pattern:
+        if op == sre_parse.BRANCH:
+            seen = set()
+            empty = False
+            for alt in av[1]:
+                first, nullable = _first(alt)
+                if first is None or first & seen or (nullable and empty):
+                    return True
+                seen |= first
+                empty = empty or nullable
+        elif op == sre_parse.SUBPATTERN:
+            if _overlapping_branch(av[3]):
+                return True
+    return False
+
+
+def _optional_overlap(pattern):
+    """True if an optional piece can start like the pattern itself
+
+    "(aa?)" is "(a|aa)" written differently: the optional tail repeats
+    the head.
+    """
+    items = _items(pattern)
+    head = _first(items)[0]
+    if head is None:
+        return True
+    if not head:
+        return False
+    for op, av in items[1:]:
+        if op == sre_parse.BRANCH and any(not _items(alt) for alt in av[1]):
+            tail = _first([(op, (None, [a for a in av[1] if _items(a)]))])[0]
+        elif op in REPEATS and av[0] == 0:
+            tail = _first(av[2])[0]
+        elif op == sre_parse.SUBPATTERN:
+            if _optional_overlap(av[3]):
+                return True
+            continue
+        else:
+            continue
+        if tail is None or tail & head:
+            return True
+    return False
+
+
+def _any_char_branch(pattern):
+    """True if the alternatives of a branch between them match any char
+
+    "(.|\\s)*" and "(\\s|\\S)*" leave a backtracking point on every char of
+    the line, where the class "[\\s\\S]*" leaves none.
+    """
+    for op, av in pattern:
+        if op == sre_parse.BRANCH:
+            first = _first([(op, av)])[0]
+            if first is not None and first >= ALPHABET - {ord("\n")}:
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _any_char_branch(av[3]):
+                return True
+    return False
+
+
+def _ambiguous(pattern, following):
+    """True if an unbounded piece of pattern can also start what follows it
+
+    following is the chars that can come after pattern, None if unknown.
+    "(.*a)" can end the .* before any "a", so repeating it n times tries
+    every way of cutting the line into n pieces. "(\\d+\\.)" cannot: its
+    digits only stop at the dot.
+    """
+    items = list(pattern)
+    for i, (op, av) in enumerate(items):
+        after, nullable = _first(items[i + 1:])
+        if after is not None and nullable:
+            after = None if following is None else after | following
+        if op in REPEATS:
+            body = _first(av[2])[0]
+            if _unbounded(av) and (body is None or after is None or body & after):
+                return True
+            # Inside the body, the next repetition follows too
+            again = None if body is None or after is None else body | after
+            if _ambiguous(av[2], again):
+                return True
+        else:
+            for child in _children(op, av):
+                if _ambiguous(child, after):
+                    return True
+    return False
+
+
+def _walk(pattern, problems):
+    for op, av in pattern:
+        if op in REPEATS and (_unbounded(av) or av[1] > 1):
+            body = av[2]
+            if _overlapping_branch(body) or _optional_overlap(body):
+                problems.append("overlapping alternatives under a quantifier")
+            elif _unbounded(av) and _any_char_branch(body):
+                problems.append("alternatives matching any char under a quantifier")
+            elif _ambiguous(body, _first(body)[0]):
+                problems.append("nested quantifier can split the input many ways")
+        for child in _children(op, av):
+            _walk(child, problems)
+
+
+def check_pattern(regex):
+    """Return a list of problems with regex (empty if it is safe to install)"""
+    try:
+        parsed = sre_parse.parse(regex)
+    except re.error as e:
+        return [f"does not compile: {e}"]
+    separated = _separate_alternatives(regex)
+    if separated is not None:
+        try:
+            parsed = sre_parse.parse(separated)
+        except re.error:
+            pass
+    problems = []
+    _walk(parsed, problems)
+    return sorted(set(problems))
+
+
+def validate(triggers):
+    """Raise ValueError naming every trigger whose regex is unsafe"""
+    errors = [
+        f"{t['regex']!r}: {', '.join(problems)}"
+        for t in triggers
+        for problems in [check_pattern(t["regex"])]
+        if problems
+    ]
+    if errors:
+        raise ValueError("unsafe trigger regex\n  " + "\n  ".join(errors))
+
+
+def iterm_triggers(triggers):
+    """Validate spec triggers and return the "Triggers" value to install"""
+    validate(triggers)
+    return [iterm_trigger(t) for t in triggers]
+
+
+# --- Profiling ----------------------------------------------------------
+
+def _literal_alternatives(regex):
+    """["Error", "Failed"] for "(Error|Failed)", None if not a plain alternation"""
+    body = regex[1:-1] if regex.startswith("(") and regex.endswith(")") else regex
+    alternatives = body.split("|")
+    if any(not alt or set(alt) & META_CHARS for alt in alternatives):
+        return None
+    return alternatives
+
+
+def suggest(regex, matches_at_start=False):
+    """Return [(cheaper regex, reason)] for a trigger regex"""
+    suggestions = []
+    alternatives = _literal_alternatives(regex)
+    if alternatives and len(alternatives) > 1:
+        folded = []
+        for alt in alternatives:
+            if alt.lower() not in folded:
+                folded.append(alt.lower())
+        if len(folded) < len(alternatives):
+            suggestions.append((
+                "(?i)(%s)" % "|".join(folded),
+                f"{len(alternatives)} case variants -> {len(folded)} "
+                "case-insensitive alternatives (also matches other casings)",
+            ))
+    if matches_at_start and not regex.startswith("^"):
+        suggestions.append((
+            "^" + regex,
+            "every match in the log starts the line; anchoring stops "
+            "the scan after the first position",
+        ))
+    return suggestions
+
+
+def profile_log(lines, regexes, repeat=1):
+    """Time each regex over lines, one search per line as iTerm2 does"""
+    size_mb = sum(len(line.encode("utf-8")) for line in lines) / (1024 * 1024)
+    results = []
+    for regex in regexes:
+        pattern = re.compile(regex)
+        search = pattern.search
+        matches = 0
+        at_start = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for line in lines:
+                match = search(line)
+                if match:
+                    matches += 1
+                    at_start += match.start() == 0
+        seconds = (time.perf_counter() - start) / repeat
+        matches //= repeat
+        results.append({
+            "regex": regex,
+            "ms": seconds * 1000,
+            "matches": matches,
+            "matches_per_mb": matches / size_mb if size_mb else 0.0,
+            "mb_per_second": size_mb / seconds if seconds else 0.0,
+            "all_at_start": matches > 0 and at_start // repeat == matches,
+        })
+    return results, size_mb
+
+
+def print_profile(lines, triggers):
+    regexes = [t["regex"] for t in triggers]
+    results, size_mb = profile_log(lines, regexes)
+    print(f"Replayed {len(lines)} lines ({size_mb:.2f}MB) "
+          f"through {len(regexes)} triggers")
+    print("")
+    total = 0.0
+    for r in results:
+        total += r["ms"]
+        print(f"  {r['ms']:8.1f}ms  {r['matches']:7} matches  "
+              f"{r['matches_per_mb']:9.1f}/MB  {r['regex']}")
+        for alternative, reason in suggest(r["regex"], r["all_at_start"]):
+            [alt] = profile_log(lines, [alternative])[0]
+            print(f"      try {alternative}  "
+                  f"({alt['ms']:.1f}ms, {alt['matches']} matches): {reason}")
+    print("")
+    print(f"  {total:8.1f}ms total, "
+          f"{size_mb / (total / 1000) if total else 0:.1f}MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = sub.add_parser("check", help="reject backtracking-prone regexes")
+    check_parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC)
+
+    profile_parser = sub.add_parser("profile", help="replay a log through the triggers")
+    profile_parser.add_argument("log")
+    profile_parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC)
+
+    args = parser.parse_args()
+    triggers = load_triggers(args.spec)
+
+    if args.command == "check":
+        missed = [r for r in UNSAFE_EXAMPLES if not check_pattern(r)]
+        if missed:
+            print(f"✗ checker no longer rejects: {', '.join(missed)}")
+            sys.exit(1)
+        flagged = [r for r in SAFE_EXAMPLES if check_pattern(r)]
+        if flagged:
+            print(f"✗ checker now rejects safe patterns: {', '.join(flagged)}")
+            sys.exit(1)
+        try:
+            validate(triggers)
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ {len(triggers)} triggers are safe to install")
+    elif args.command == "profile":
+        with open(args.log, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+        print_profile(lines, triggers)
+
+
+if __name__ == "__main__":
+    main()